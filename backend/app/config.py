@@ -44,6 +44,8 @@ class Settings(BaseSettings):
     MAX_CONNECTIONS: int = Field(default=1000, env="MAX_CONNECTIONS")
     BATCH_SIZE: int = Field(default=100, env="BATCH_SIZE")
     UPDATE_FREQUENCY: int = Field(default=100, env="UPDATE_FREQUENCY")  # milliseconds
+    TARGET_LATENCY_MS: int = Field(default=100, env="TARGET_LATENCY_MS")  # per-cycle processing budget
+    MAX_INFLIGHT_SYMBOLS: int = Field(default=25, env="MAX_INFLIGHT_SYMBOLS")
     
     # Market Data Configuration
     DEFAULT_SYMBOLS: list = Field(default=["AAPL", "MSFT", "GOOGL", "TSLA", "AMZN"], env="DEFAULT_SYMBOLS")
@@ -23,6 +23,8 @@ class RedisClient:
         self.client: Optional[Redis] = None
         self.url = settings.REDIS_URL
         self.db = settings.REDIS_DB
+        self._symbol_keys: Dict[str, tuple] = {}  # symbol -> (latest, history) keys
+        self._indicator_keys: Dict[tuple, str] = {}  # (symbol, indicator) -> key
         
     async def connect(self):
         """Connect to Redis"""
@@ -255,6 +257,59 @@ class RedisClient:
             logger.error(f"Failed to add to price history in Redis: {e}")
             raise
     
+    async def write_batch(
+        self,
+        symbol: str,
+        price_data: Dict[str, Any],
+        indicators: Optional[Dict[str, Any]] = None,
+        ttl: int = 300,
+        max_points: int = 1000
+    ):
+        """Write latest price, history entry and indicators in one round-trip
+
+        Queues the same commands set_latest_price, add_to_price_history and
+        set_technical_indicator would issue individually, but on a single
+        pipeline so the whole store costs one network round-trip instead of
+        4-8 serial ones. The payload is pickled once and shared by the
+        latest-price and history entries, and key strings are formatted
+        once per symbol instead of on every tick.
+        """
+        try:
+            if not self.client:
+                raise RuntimeError("Redis not connected")
+
+            value = pickle.dumps(price_data)
+
+            keys = self._symbol_keys.get(symbol)
+            if keys is None:
+                keys = self._symbol_keys[symbol] = (
+                    f"price:{symbol}:latest",
+                    f"price_history:{symbol}"
+                )
+            latest_key, history_key = keys
+
+            pipe = self.client.pipeline(transaction=False)
+            pipe.setex(latest_key, ttl, value)
+            pipe.lpush(history_key, value)
+            pipe.ltrim(history_key, 0, max_points - 1)
+            pipe.expire(history_key, 86400)  # 24 hours
+
+            if indicators:
+                for indicator, indicator_value in indicators.items():
+                    if indicator_value is not None:
+                        indicator_key = self._indicator_keys.get((symbol, indicator))
+                        if indicator_key is None:
+                            indicator_key = self._indicator_keys[(symbol, indicator)] = (
+                                f"indicator:{symbol}:{indicator}:20"
+                            )
+                        pipe.setex(indicator_key, 1800, pickle.dumps({"value": indicator_value}))
+
+            await pipe.execute()
+
+        except Exception as e:
+            logger.error(f"Failed to write batch to Redis: {e}")
+            raise
+
     async def get_price_history(self, symbol: str, limit: int = 100) -> List[Dict[str, Any]]:
         """Get price history for a symbol"""
         try:
@@ -0,0 +1,107 @@
+"""
+Shared TTL cache for provider responses
+"""
+
+import logging
+import pickle
+import time
+import zlib
+from typing import Any, Awaitable, Callable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Tiered TTLs (seconds) by how fast the data goes stale
+TTL_QUOTE = 2
+TTL_INTRADAY = 30
+TTL_HISTORICAL = 3600
+TTL_REFERENCE = 86400
+
+class ResponseCache:
+    """TTL cache for provider responses, Redis-backed when available
+
+    Serves repeat requests for slow-changing data (company info, symbol
+    lists, search results) without spending rate-limit budget. Entries
+    live in a local dict keyed on the monotonic clock; when a Redis
+    client is attached, values are also stored there (pickled and
+    zlib-compressed, ~5x smaller than JSON for bulk reference data) so
+    multiple workers share one upstream fetch. Redis failures fall open
+    to the local dict.
+    """
+
+    def __init__(self, redis_client=None, max_local_entries: int = 10000):
+        self.redis_client = redis_client
+        self.max_local_entries = max_local_entries
+        self._local: dict = {}
+        self.hits = 0
+        self.misses = 0
+        self._last_stats_log = time.monotonic()
+
+    def attach_redis(self, redis_client) -> None:
+        """Attach a connected Redis client for cross-process sharing"""
+        self.redis_client = redis_client
+
+    async def cached(
+        self,
+        key: Tuple,
+        ttl: float,
+        fetcher: Callable[[], Awaitable[Any]]
+    ) -> Optional[Any]:
+        """Return the cached value for key, or fetch and store it
+
+        key is a (provider, endpoint, *args) tuple; fetcher is only
+        awaited on a miss, and None results are not cached so transient
+        failures retry on the next call.
+        """
+        cache_key = "provider_cache:" + ":".join(str(part) for part in key)
+        now = time.monotonic()
+
+        entry = self._local.get(cache_key)
+        if entry is not None and entry[0] > now:
+            self.hits += 1
+            self._maybe_log_stats(now)
+            return entry[1]
+
+        if self.redis_client:
+            try:
+                raw = await self.redis_client.get(cache_key)
+                if raw is not None:
+                    value = pickle.loads(zlib.decompress(raw))
+                    self._local[cache_key] = (now + ttl, value)
+                    self.hits += 1
+                    self._maybe_log_stats(now)
+                    return value
+            except Exception as e:
+                logger.error(f"Cache read failed for {cache_key}: {e}")
+
+        self.misses += 1
+        value = await fetcher()
+
+        if value is not None:
+            if len(self._local) >= self.max_local_entries:
+                # Drop the oldest insertion; dicts preserve insert order
+                self._local.pop(next(iter(self._local)))
+            self._local[cache_key] = (now + ttl, value)
+            if self.redis_client:
+                try:
+                    await self.redis_client.setex(
+                        cache_key, int(ttl), zlib.compress(pickle.dumps(value))
+                    )
+                except Exception as e:
+                    logger.error(f"Cache write failed for {cache_key}: {e}")
+
+        self._maybe_log_stats(now)
+        return value
+
+    def _maybe_log_stats(self, now: float) -> None:
+        """Log hit/miss counters at most once a minute"""
+        if now - self._last_stats_log >= 60:
+            self._last_stats_log = now
+            total = self.hits + self.misses
+            if total:
+                logger.info(
+                    "Provider cache: %d hits / %d misses (%.1f%% hit rate)",
+                    self.hits, self.misses, 100.0 * self.hits / total
+                )
+
+# Module-level cache shared by all providers
+response_cache = ResponseCache()
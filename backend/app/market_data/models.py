@@ -0,0 +1,111 @@
+"""
+Slot-based row models for bulk provider responses
+
+Historical and trade endpoints return thousands of rows, and a dict row
+carries a hash table plus per-row key references. These classes hold
+the same fields in fixed __slots__ (several times smaller per row) for
+bulk consumers that iterate columns or write to disk; to_dict()
+converts at boundaries where the dict shape is required.
+"""
+
+from typing import Any, Dict, List, Optional
+
+class Quote:
+    """One real-time quote"""
+
+    __slots__ = (
+        "symbol", "price", "change", "change_percent", "volume",
+        "high", "low", "open", "previous_close", "timestamp", "provider"
+    )
+
+    def __init__(
+        self,
+        symbol: str,
+        price: float = 0.0,
+        change: float = 0.0,
+        change_percent: float = 0.0,
+        volume: int = 0,
+        high: float = 0.0,
+        low: float = 0.0,
+        open: float = 0.0,
+        previous_close: float = 0.0,
+        timestamp: str = "",
+        provider: str = ""
+    ):
+        self.symbol = symbol
+        self.price = price
+        self.change = change
+        self.change_percent = change_percent
+        self.volume = volume
+        self.high = high
+        self.low = low
+        self.open = open
+        self.previous_close = previous_close
+        self.timestamp = timestamp
+        self.provider = provider
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to the dict shape the rest of the app consumes"""
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+class Bar:
+    """One OHLCV aggregate bar"""
+
+    __slots__ = (
+        "symbol", "date", "open", "high", "low", "close",
+        "volume", "vwap", "provider"
+    )
+
+    def __init__(
+        self,
+        symbol: str,
+        date: str,
+        open: float = 0.0,
+        high: float = 0.0,
+        low: float = 0.0,
+        close: float = 0.0,
+        volume: int = 0,
+        vwap: float = 0.0,
+        provider: str = ""
+    ):
+        self.symbol = symbol
+        self.date = date
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+        self.vwap = vwap
+        self.provider = provider
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to the dict shape the rest of the app consumes"""
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+class Trade:
+    """One executed trade"""
+
+    __slots__ = ("symbol", "timestamp", "price", "size", "exchange",
+                 "conditions", "provider")
+
+    def __init__(
+        self,
+        symbol: str,
+        timestamp: str,
+        price: float = 0.0,
+        size: int = 0,
+        exchange: str = "",
+        conditions: Optional[List] = None,
+        provider: str = ""
+    ):
+        self.symbol = symbol
+        self.timestamp = timestamp
+        self.price = price
+        self.size = size
+        self.exchange = exchange
+        self.conditions = conditions if conditions is not None else []
+        self.provider = provider
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to the dict shape the rest of the app consumes"""
+        return {slot: getattr(self, slot) for slot in self.__slots__}
@@ -4,12 +4,15 @@ Anomaly detector for market data using machine learning
 
 import logging
 import numpy as np
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Union
 from datetime import datetime, timedelta
 from sklearn.ensemble import IsolationForest
 from sklearn.preprocessing import StandardScaler
 import warnings
 
+from app.market_data.processors.anomaly_kernel import compute_scores
+from app.market_data.processors.price_buffer import PriceBuffer
+
 warnings.filterwarnings('ignore')
 
 logger = logging.getLogger(__name__)
@@ -19,9 +22,13 @@ class AnomalyDetector:
     
     def __init__(self):
         self.logger = logging.getLogger(__name__)
-        self.models = {}  # symbol -> model
-        self.scalers = {}  # symbol -> scaler
+        self.global_model = None  # single IsolationForest shared across symbols
+        self.global_scaler = None  # scaler fitted on the pooled feature matrix
+        self.symbol_ids = {}  # symbol -> numeric id appended as a feature
         self.training_data = {}  # symbol -> training data
+        self._fv_buf = np.empty((1, 9), dtype=np.float64)  # reused feature-vector buffer (8 features + symbol id)
+        self._model_info = None  # static model metadata cached at training time
+        self._clip_bounds = None  # (lo, hi) 10-90th percentile bounds of scaled features
         self.anomaly_thresholds = {
             "price_change": 0.05,  # 5% price change
             "volume_spike": 3.0,    # 3x volume increase
@@ -31,129 +38,126 @@ class AnomalyDetector:
         }
         
     def detect_anomaly(
-        self, 
-        symbol: str, 
-        price_history: List[Dict[str, Any]], 
-        current_data: Dict[str, Any]
+        self,
+        symbol: str,
+        price_history: Union[PriceBuffer, List[Dict[str, Any]]],
+        current_data: Dict[str, Any],
+        early_threshold: float = 0.9
     ) -> float:
-        """Detect anomalies in market data"""
+        """Detect anomalies in market data, cheapest detectors first"""
         try:
             if len(price_history) < 20:
                 return 0.0  # Not enough data
-            
-            # Calculate anomaly score using multiple methods
+
+            # Columnar view of the history: zero-copy for PriceBuffer input,
+            # one conversion pass for the legacy list-of-dicts layout
+            if isinstance(price_history, PriceBuffer):
+                prices, volumes, _ = price_history.view()
+            else:
+                n = len(price_history)
+                prices = np.fromiter(
+                    (point["price"] for point in price_history), dtype=np.float64, count=n
+                )
+                volumes = np.fromiter(
+                    (point["volume"] for point in price_history), dtype=np.float64, count=n
+                )
+
+            # Run the cheap detectors through the fused kernel: one pass
+            # over contiguous arrays yields all three scores at once
+            cheap_scores = compute_scores(
+                prices,
+                volumes,
+                current_data.get("price", 0),
+                current_data.get("volume", 0),
+                self.anomaly_thresholds["price_change"],
+                self.anomaly_thresholds["volume_spike"]
+            )
+
+            # Short-circuit once a single detector dominates the aggregate
             scores = []
-            
-            # 1. Statistical anomaly detection
-            statistical_score = self._detect_statistical_anomaly(price_history, current_data)
-            if statistical_score is not None:
-                scores.append(statistical_score)
-            
-            # 2. ML-based anomaly detection
-            ml_score = self._detect_ml_anomaly(symbol, price_history, current_data)
-            if ml_score is not None:
-                scores.append(ml_score)
-            
-            # 3. Pattern-based anomaly detection
-            pattern_score = self._detect_pattern_anomaly(price_history, current_data)
-            if pattern_score is not None:
-                scores.append(pattern_score)
-            
-            # 4. Volume anomaly detection
-            volume_score = self._detect_volume_anomaly(price_history, current_data)
-            if volume_score is not None:
-                scores.append(volume_score)
-            
+            for score in cheap_scores:
+                scores.append(score)
+                if score >= early_threshold:
+                    return round(np.mean(scores), 4)
+
+            # Register new symbols so the global model picks them up at the
+            # next (re)train
+            if symbol not in self.training_data:
+                records = (
+                    price_history.to_records()
+                    if isinstance(price_history, PriceBuffer)
+                    else price_history
+                )
+                self._train_model(symbol, records)
+
+            # ML detection is the expensive branch: skip feature extraction
+            # entirely while no model has been trained
+            if self.global_model is not None:
+                ml_score = self._detect_ml_anomaly(symbol, prices, volumes, current_data)
+                if ml_score is not None:
+                    scores.append(ml_score)
+
             # Return average score if we have any scores
             if scores:
                 return round(np.mean(scores), 4)
-            
+
             return 0.0
-            
+
         except Exception as e:
             self.logger.error(f"Failed to detect anomaly for {symbol}: {e}")
             return 0.0
     
     def _detect_statistical_anomaly(
-        self, 
-        price_history: List[Dict[str, Any]], 
+        self,
+        prices: np.ndarray,
+        volumes: np.ndarray,
         current_data: Dict[str, Any]
     ) -> Optional[float]:
-        """Detect anomalies using statistical methods"""
-        try:
-            prices = [point["price"] for point in price_history]
-            volumes = [point["volume"] for point in price_history]
-            
-            if not prices or not volumes:
-                return None
-            
-            current_price = current_data.get("price", 0)
-            current_volume = current_data.get("volume", 0)
-            
-            # Calculate statistics
-            mean_price = np.mean(prices)
-            std_price = np.std(prices)
-            mean_volume = np.mean(volumes)
-            std_volume = np.std(volumes)
-            
-            # Z-score for price
-            if std_price > 0:
-                price_z_score = abs((current_price - mean_price) / std_price)
-            else:
-                price_z_score = 0
-            
-            # Z-score for volume
-            if std_volume > 0:
-                volume_z_score = abs((current_volume - mean_volume) / std_volume)
-            else:
-                volume_z_score = 0
-            
-            # Calculate anomaly score (0-1 scale)
-            price_score = min(price_z_score / 3.0, 1.0)  # Normalize to 0-1
-            volume_score = min(volume_z_score / 3.0, 1.0)
-            
-            # Combined score
-            combined_score = (price_score + volume_score) / 2
-            
-            return combined_score
-            
-        except Exception as e:
-            self.logger.error(f"Failed to detect statistical anomaly: {e}")
+        """Detect anomalies using statistical methods (clamped z-scores)
+
+        Hot path: no try/except here, crash-safety lives in detect_anomaly.
+        """
+        if prices.shape[0] < 20:
             return None
+
+        return self._kernel_scores(prices, volumes, current_data)[0]
     
     def _detect_ml_anomaly(
-        self, 
-        symbol: str, 
-        price_history: List[Dict[str, Any]], 
+        self,
+        symbol: str,
+        prices: np.ndarray,
+        volumes: np.ndarray,
         current_data: Dict[str, Any]
     ) -> Optional[float]:
         """Detect anomalies using machine learning (Isolation Forest)"""
         try:
             # Prepare features
-            features = self._extract_features(price_history, current_data)
+            features = self._extract_features(prices, volumes, current_data)
             if not features:
                 return None
-            
-            # Train or update model
-            if symbol not in self.models:
-                self._train_model(symbol, price_history)
-            
-            if symbol in self.models and self.models[symbol] is not None:
-                # Predict anomaly
-                feature_vector = np.array(features).reshape(1, -1)
-                
-                # Scale features
-                if symbol in self.scalers:
-                    feature_vector = self.scalers[symbol].transform(feature_vector)
-                
+
+            if self.global_model is not None:
+                # Fill the preallocated buffer in place instead of allocating
+                # a fresh array per call (features + symbol id column)
+                self._fv_buf[0, :8] = features
+                self._fv_buf[0, 8] = self._get_symbol_id(symbol)
+                feature_vector = self._fv_buf
+
+                # Scale features and apply the same percentile clip the
+                # model was trained with
+                if self.global_scaler is not None:
+                    feature_vector = self.global_scaler.transform(feature_vector)
+                if self._clip_bounds is not None:
+                    feature_vector = np.clip(feature_vector, *self._clip_bounds)
+
                 # Get prediction (-1 for anomaly, 1 for normal)
-                prediction = self.models[symbol].predict(feature_vector)[0]
-                
+                prediction = self.global_model.predict(feature_vector)[0]
+
                 # Convert to anomaly score (0-1)
                 anomaly_score = 1.0 if prediction == -1 else 0.0
-                
+
                 return anomaly_score
-            
+
             return None
             
         except Exception as e:
@@ -161,178 +165,186 @@ class AnomalyDetector:
             return None
     
     def _detect_pattern_anomaly(
-        self, 
-        price_history: List[Dict[str, Any]], 
+        self,
+        prices: np.ndarray,
+        volumes: np.ndarray,
         current_data: Dict[str, Any]
     ) -> Optional[float]:
-        """Detect anomalies based on price patterns"""
-        try:
-            prices = [point["price"] for point in price_history]
-            
-            if len(prices) < 5:
-                return None
-            
-            current_price = current_data.get("price", 0)
-            
-            # Check for price gaps
-            recent_prices = prices[-5:]
-            price_changes = [abs(recent_prices[i] - recent_prices[i-1]) / recent_prices[i-1] 
-                           for i in range(1, len(recent_prices))]
-            
-            # Check for sudden price movements
-            if price_changes:
-                max_change = max(price_changes)
-                if max_change > self.anomaly_thresholds["price_change"]:
-                    return min(max_change / self.anomaly_thresholds["price_change"], 1.0)
-            
-            # Check for price reversals
-            if len(prices) >= 10:
-                short_trend = np.mean(prices[-5:]) - np.mean(prices[-10:-5])
-                long_trend = np.mean(prices[-10:]) - np.mean(prices[-20:-10]) if len(prices) >= 20 else 0
-                
-                # If trends are opposite, it might be an anomaly
-                if short_trend * long_trend < 0:
-                    trend_strength = abs(short_trend) / (abs(long_trend) + 1e-8)
-                    return min(trend_strength, 1.0)
-            
-            return 0.0
-            
-        except Exception as e:
-            self.logger.error(f"Failed to detect pattern anomaly: {e}")
+        """Detect anomalies based on price patterns (gaps, reversals)
+
+        Hot path: no try/except here, crash-safety lives in detect_anomaly.
+        """
+        if prices.shape[0] < 20:
             return None
-    
+
+        return self._kernel_scores(prices, volumes, current_data)[1]
+
     def _detect_volume_anomaly(
-        self, 
-        price_history: List[Dict[str, Any]], 
+        self,
+        prices: np.ndarray,
+        volumes: np.ndarray,
         current_data: Dict[str, Any]
     ) -> Optional[float]:
-        """Detect anomalies based on volume patterns"""
-        try:
-            volumes = [point["volume"] for point in price_history]
-            
-            if len(volumes) < 10:
-                return None
-            
-            current_volume = current_data.get("volume", 0)
-            
-            # Calculate volume statistics
-            mean_volume = np.mean(volumes)
-            std_volume = np.std(volumes)
-            
-            # Check for volume spikes
-            if mean_volume > 0:
-                volume_ratio = current_volume / mean_volume
-                if volume_ratio > self.anomaly_thresholds["volume_spike"]:
-                    return min((volume_ratio - 1) / (self.anomaly_thresholds["volume_spike"] - 1), 1.0)
-            
-            # Check for unusual volume patterns
-            recent_volumes = volumes[-10:]
-            volume_trend = np.polyfit(range(len(recent_volumes)), recent_volumes, 1)[0]
-            
-            # If volume is increasing rapidly, it might be an anomaly
-            if volume_trend > mean_volume * 0.1:  # 10% increase per period
-                return min(volume_trend / (mean_volume * 0.2), 1.0)  # Normalize
-            
-            return 0.0
-            
-        except Exception as e:
-            self.logger.error(f"Failed to detect volume anomaly: {e}")
+        """Detect anomalies based on volume patterns (spikes, trend)
+
+        Hot path: no try/except here, crash-safety lives in detect_anomaly.
+        """
+        if volumes.shape[0] < 20:
             return None
-    
+
+        return self._kernel_scores(prices, volumes, current_data)[2]
+
+    def _kernel_scores(
+        self,
+        prices: np.ndarray,
+        volumes: np.ndarray,
+        current_data: Dict[str, Any]
+    ) -> tuple:
+        """Run the fused kernel with the configured thresholds"""
+        return compute_scores(
+            prices,
+            volumes,
+            current_data.get("price", 0),
+            current_data.get("volume", 0),
+            self.anomaly_thresholds["price_change"],
+            self.anomaly_thresholds["volume_spike"]
+        )
+
     def _extract_features(
-        self, 
-        price_history: List[Dict[str, Any]], 
+        self,
+        prices: np.ndarray,
+        volumes: np.ndarray,
         current_data: Dict[str, Any]
     ) -> Optional[List[float]]:
-        """Extract features for machine learning model"""
-        try:
-            if len(price_history) < 20:
-                return None
-            
-            prices = [point["price"] for point in price_history]
-            volumes = [point["volume"] for point in price_history]
-            
-            # Price-based features
-            price_change = (prices[-1] - prices[-2]) / prices[-2] if len(prices) > 1 else 0
-            price_volatility = np.std(prices[-20:]) / np.mean(prices[-20:]) if len(prices) >= 20 else 0
-            
-            # Volume-based features
-            volume_change = (volumes[-1] - volumes[-2]) / volumes[-2] if len(volumes) > 1 else 0
-            volume_ratio = volumes[-1] / np.mean(volumes[-20:]) if len(volumes) >= 20 else 1
-            
-            # Technical features
-            sma_20 = np.mean(prices[-20:]) if len(prices) >= 20 else prices[-1]
-            price_to_sma = prices[-1] / sma_20 if sma_20 > 0 else 1
-            
-            # Momentum features
-            momentum_5 = (prices[-1] - prices[-5]) / prices[-5] if len(prices) >= 5 else 0
-            momentum_10 = (prices[-1] - prices[-10]) / prices[-10] if len(prices) >= 10 else 0
-            
-            # Spread features (if available)
-            spread = current_data.get("spread", 0)
-            spread_ratio = spread / prices[-1] if prices[-1] > 0 else 0
-            
-            features = [
-                price_change,
-                price_volatility,
-                volume_change,
-                volume_ratio,
-                price_to_sma,
-                momentum_5,
-                momentum_10,
-                spread_ratio
-            ]
-            
-            # Remove any infinite or NaN values
-            features = [f if np.isfinite(f) else 0.0 for f in features]
-            
-            return features
-            
-        except Exception as e:
-            self.logger.error(f"Failed to extract features: {e}")
+        """Extract features for machine learning model
+
+        Hot path: no try/except here, crash-safety lives in detect_anomaly;
+        divide-by-zero yields inf/nan which the final cleanup maps to 0.
+        """
+        if prices.shape[0] < 20:
             return None
+
+        recent_prices = prices[-20:]
+        recent_volumes = volumes[-20:]
+
+        # Price-based features
+        price_change = (prices[-1] - prices[-2]) / prices[-2]
+        price_volatility = recent_prices.std() / recent_prices.mean()
+
+        # Volume-based features
+        volume_change = (volumes[-1] - volumes[-2]) / volumes[-2] if volumes[-2] != 0 else 0
+        mean_volume = recent_volumes.mean()
+        volume_ratio = volumes[-1] / mean_volume if mean_volume > 0 else 1
+
+        # Technical features
+        sma_20 = recent_prices.mean()
+        price_to_sma = prices[-1] / sma_20 if sma_20 > 0 else 1
+
+        # Momentum features
+        momentum_5 = (prices[-1] - prices[-5]) / prices[-5]
+        momentum_10 = (prices[-1] - prices[-10]) / prices[-10]
+
+        # Spread features (if available)
+        spread = current_data.get("spread", 0)
+        spread_ratio = spread / prices[-1] if prices[-1] > 0 else 0
+
+        features = [
+            price_change,
+            price_volatility,
+            volume_change,
+            volume_ratio,
+            price_to_sma,
+            momentum_5,
+            momentum_10,
+            spread_ratio
+        ]
+
+        # Remove any infinite or NaN values
+        return [float(f) if np.isfinite(f) else 0.0 for f in features]
     
+    def _get_symbol_id(self, symbol: str) -> int:
+        """Get (or assign) the numeric id used as the symbol feature column"""
+        if symbol not in self.symbol_ids:
+            self.symbol_ids[symbol] = len(self.symbol_ids)
+        return self.symbol_ids[symbol]
+
     def _train_model(self, symbol: str, price_history: List[Dict[str, Any]]):
-        """Train isolation forest model for a symbol"""
+        """Register training data for a symbol and retrain the global model"""
         try:
             if len(price_history) < 50:
                 return
-            
-            # Extract features for training
+
+            self.training_data[symbol] = price_history
+            self._train_global_model()
+
+        except Exception as e:
+            self.logger.error(f"Failed to train model for {symbol}: {e}")
+
+    def _train_global_model(self):
+        """Train one isolation forest on the pooled data of all symbols"""
+        try:
+            # Extract features across every symbol's training buffer,
+            # tagging each row with its symbol id
             training_features = []
-            for i in range(20, len(price_history)):
-                features = self._extract_features(price_history[:i+1], price_history[i])
-                if features:
-                    training_features.append(features)
-            
+            for symbol, price_history in self.training_data.items():
+                symbol_id = self._get_symbol_id(symbol)
+                n = len(price_history)
+                prices = np.fromiter(
+                    (point["price"] for point in price_history), dtype=np.float64, count=n
+                )
+                volumes = np.fromiter(
+                    (point["volume"] for point in price_history), dtype=np.float64, count=n
+                )
+                for i in range(20, n):
+                    features = self._extract_features(
+                        prices[:i+1], volumes[:i+1], price_history[i]
+                    )
+                    if features:
+                        training_features.append(features + [symbol_id])
+
             if len(training_features) < 10:
                 return
-            
+
             # Convert to numpy array
             X = np.array(training_features)
-            
+
             # Scale features
             scaler = StandardScaler()
             X_scaled = scaler.fit_transform(X)
-            
+
+            # Winsorize to the 10-90th percentile per feature: bounding the
+            # isolation forest's split ranges raises sensitivity to subtle
+            # outliers compared to raw min/max splits
+            lo, hi = np.percentile(X_scaled, [10, 90], axis=0)
+            X_scaled = np.clip(X_scaled, lo, hi)
+
             # Train isolation forest
             model = IsolationForest(
                 contamination=0.1,  # Expect 10% anomalies
                 random_state=42,
                 n_estimators=100
             )
-            
+
             model.fit(X_scaled)
-            
-            # Store model and scaler
-            self.models[symbol] = model
-            self.scalers[symbol] = scaler
-            self.training_data[symbol] = price_history
-            
-            self.logger.info(f"Trained anomaly detection model for {symbol}")
-            
+
+            # Store model, scaler and static metadata (snapshotted once here
+            # so get_model_performance never formats timestamps per call)
+            self.global_model = model
+            self.global_scaler = scaler
+            self._clip_bounds = (lo, hi)
+            self._model_info = {
+                "model_type": type(model).__name__,
+                "n_estimators": model.n_estimators,
+                "contamination": model.contamination,
+                "last_updated": datetime.utcnow().isoformat()
+            }
+
+            self.logger.info(
+                f"Trained global anomaly detection model on {len(self.training_data)} symbols"
+            )
+
         except Exception as e:
-            self.logger.error(f"Failed to train model for {symbol}: {e}")
+            self.logger.error(f"Failed to train global model: {e}")
     
     def _update_model(self, symbol: str, new_data: Dict[str, Any]):
         """Update model with new data"""
@@ -342,7 +354,7 @@ class AnomalyDetector:
                 
                 # Retrain model periodically (every 100 new data points)
                 if len(self.training_data[symbol]) % 100 == 0:
-                    self._train_model(symbol, self.training_data[symbol])
+                    self._train_global_model()
             
         except Exception as e:
             self.logger.error(f"Failed to update model for {symbol}: {e}")
@@ -352,7 +364,7 @@ class AnomalyDetector:
         try:
             summary = {
                 "symbol": symbol,
-                "model_trained": symbol in self.models,
+                "model_trained": self.global_model is not None and symbol in self.training_data,
                 "training_data_points": len(self.training_data.get(symbol, [])),
                 "last_training": None,
                 "anomaly_thresholds": self.anomaly_thresholds.copy()
@@ -382,37 +394,35 @@ class AnomalyDetector:
     def get_model_performance(self, symbol: str) -> Dict[str, Any]:
         """Get model performance metrics"""
         try:
-            if symbol not in self.models:
+            if self._model_info is None or symbol not in self.training_data:
                 return {"error": "Model not trained"}
-            
-            # Calculate basic performance metrics
-            model = self.models[symbol]
-            
-            performance = {
+
+            # Static metadata is cached at training time; only the per-symbol
+            # sample count is looked up per call
+            return {
                 "symbol": symbol,
-                "model_type": type(model).__name__,
-                "n_estimators": getattr(model, 'n_estimators', 'N/A'),
-                "contamination": getattr(model, 'contamination', 'N/A'),
-                "training_samples": len(self.training_data.get(symbol, [])),
-                "last_updated": datetime.utcnow().isoformat()
+                **self._model_info,
+                "training_samples": len(self.training_data[symbol])
             }
             
-            return performance
-            
         except Exception as e:
             self.logger.error(f"Failed to get model performance for {symbol}: {e}")
             return {"error": str(e)}
     
     def reset_model(self, symbol: str):
-        """Reset anomaly detection model for a symbol"""
+        """Remove a symbol's data from the global model and retrain"""
         try:
-            if symbol in self.models:
-                del self.models[symbol]
-            if symbol in self.scalers:
-                del self.scalers[symbol]
             if symbol in self.training_data:
                 del self.training_data[symbol]
-            
+
+            if self.training_data:
+                self._train_global_model()
+            else:
+                self.global_model = None
+                self.global_scaler = None
+                self._model_info = None
+                self._clip_bounds = None
+
             self.logger.info(f"Reset anomaly detection model for {symbol}")
             
         except Exception as e:
@@ -422,11 +432,12 @@ class AnomalyDetector:
         """Get information about all trained models"""
         try:
             info = {
-                "total_models": len(self.models),
+                "total_models": 1 if self.global_model is not None else 0,
+                "tracked_symbols": len(self.training_data),
                 "models": {}
             }
-            
-            for symbol in self.models:
+
+            for symbol in self.training_data:
                 info["models"][symbol] = self.get_model_performance(symbol)
             
             return info
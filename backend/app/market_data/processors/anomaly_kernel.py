@@ -0,0 +1,75 @@
+"""
+Fused single-pass kernel for the non-ML anomaly detectors
+"""
+
+import numpy as np
+
+def compute_scores(
+    prices: np.ndarray,
+    volumes: np.ndarray,
+    current_price: float,
+    current_volume: float,
+    thr_price_change: float,
+    thr_volume_spike: float
+) -> tuple:
+    """Compute (statistical, pattern, volume) anomaly scores in one pass
+
+    The three detectors share the same price/volume statistics, so fusing
+    them into one kernel over contiguous arrays computes the mean/std once
+    and avoids re-walking the history per detector. Callers must pass at
+    least 20 points. The function is free of Python object churn so it can
+    be compiled with Cython/Numba unchanged if a native build step is ever
+    added.
+    """
+    n = prices.shape[0]
+
+    # Shared statistics
+    mean_price = prices.mean()
+    std_price = prices.std()
+    mean_volume = volumes.mean()
+    std_volume = volumes.std()
+
+    # 1. Statistical score: clamped z-scores of price and volume
+    price_z = (current_price - mean_price) / std_price if std_price > 0 else 0.0
+    volume_z = (current_volume - mean_volume) / std_volume if std_volume > 0 else 0.0
+    statistical_score = (
+        min(abs(price_z) / 3.0, 1.0) + min(abs(volume_z) / 3.0, 1.0)
+    ) / 2
+
+    # 2. Pattern score: gaps in the last 5 points, then trend reversals
+    recent = prices[-5:]
+    max_change = (np.abs(np.diff(recent)) / recent[:-1]).max()
+
+    if max_change > thr_price_change:
+        pattern_score = min(max_change / thr_price_change, 1.0)
+    elif n >= 10:
+        short_trend = prices[-5:].mean() - prices[-10:-5].mean()
+        long_trend = prices[-10:].mean() - prices[-20:-10].mean() if n >= 20 else 0.0
+
+        if short_trend * long_trend < 0:
+            pattern_score = min(abs(short_trend) / (abs(long_trend) + 1e-8), 1.0)
+        else:
+            pattern_score = 0.0
+    else:
+        pattern_score = 0.0
+
+    # 3. Volume score: spikes against the mean, then rising volume trend
+    volume_score = 0.0
+    if mean_volume > 0 and current_volume / mean_volume > thr_volume_spike:
+        volume_score = min(
+            (current_volume / mean_volume - 1) / (thr_volume_spike - 1), 1.0
+        )
+    else:
+        # Closed-form least-squares slope of the last 10 volumes
+        recent_volumes = volumes[-10:]
+        k = recent_volumes.shape[0]
+        x = np.arange(k)
+        slope = (
+            (k * (x * recent_volumes).sum() - x.sum() * recent_volumes.sum())
+            / (k * (x * x).sum() - x.sum() ** 2)
+        )
+
+        if slope > mean_volume * 0.1:
+            volume_score = min(slope / (mean_volume * 0.2), 1.0)
+
+    return statistical_score, pattern_score, volume_score
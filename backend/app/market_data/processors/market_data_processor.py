@@ -4,14 +4,18 @@ Market data processor for real-time data ingestion and processing
 
 import asyncio
 import logging
+from collections import deque
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timedelta
 import time
 
+import httpx
+
 from app.config import settings
 from app.database.influx_client import InfluxDBClient
 from app.database.redis_client import RedisClient
 from app.websocket.manager import WebSocketManager
+from app.market_data.resilience import HTTP2_AVAILABLE
 from app.market_data.providers.alpha_vantage import AlphaVantageProvider
 from app.market_data.providers.iex_cloud import IEXCloudProvider
 from app.market_data.providers.yahoo_finance import YahooFinanceProvider
@@ -19,9 +23,99 @@ from app.market_data.providers.eodhd import EODHDProvider
 from app.market_data.providers.polygon import PolygonProvider
 from app.market_data.processors.technical_indicators import TechnicalIndicators
 from app.market_data.processors.anomaly_detector import AnomalyDetector
+from app.market_data.processors.price_buffer import PriceBuffer
 
 logger = logging.getLogger(__name__)
 
+class SymbolAggregator:
+    """Per-symbol rolling indicator state, updated in O(1) per tick
+
+    Replaces the O(window) recomputation of SMA-20/50, RSI-14 and VWAP on
+    every tick: each push subtracts the value leaving a window from its
+    rolling sum and adds the new one, so reading an indicator is a single
+    division. __slots__ keeps the per-symbol footprint flat since one of
+    these lives for every tracked symbol.
+    """
+
+    __slots__ = (
+        "_sma20", "_sma20_sum", "_sma50", "_sma50_sum",
+        "_moves", "_gain_sum", "_loss_sum",
+        "_flows", "_pv_sum", "_volume_sum", "_last_price"
+    )
+
+    def __init__(self, vwap_window: int = 1000):
+        self._sma20 = deque(maxlen=20)
+        self._sma20_sum = 0.0
+        self._sma50 = deque(maxlen=50)
+        self._sma50_sum = 0.0
+        self._moves = deque(maxlen=14)  # (gain, loss) per tick
+        self._gain_sum = 0.0
+        self._loss_sum = 0.0
+        self._flows = deque(maxlen=vwap_window)  # (price*volume, volume)
+        self._pv_sum = 0.0
+        self._volume_sum = 0.0
+        self._last_price = None
+
+    def push(self, price: float, volume: float):
+        """Push one tick into every rolling window"""
+        if len(self._sma20) == self._sma20.maxlen:
+            self._sma20_sum -= self._sma20[0]
+        self._sma20.append(price)
+        self._sma20_sum += price
+
+        if len(self._sma50) == self._sma50.maxlen:
+            self._sma50_sum -= self._sma50[0]
+        self._sma50.append(price)
+        self._sma50_sum += price
+
+        if self._last_price is not None:
+            delta = price - self._last_price
+            move = (delta, 0.0) if delta > 0 else (0.0, -delta)
+            if len(self._moves) == self._moves.maxlen:
+                old_gain, old_loss = self._moves[0]
+                self._gain_sum -= old_gain
+                self._loss_sum -= old_loss
+            self._moves.append(move)
+            self._gain_sum += move[0]
+            self._loss_sum += move[1]
+        self._last_price = price
+
+        if len(self._flows) == self._flows.maxlen:
+            old_pv, old_volume = self._flows[0]
+            self._pv_sum -= old_pv
+            self._volume_sum -= old_volume
+        flow = (price * volume, volume)
+        self._flows.append(flow)
+        self._pv_sum += flow[0]
+        self._volume_sum += flow[1]
+
+    @property
+    def sma_20(self) -> Optional[float]:
+        if len(self._sma20) < self._sma20.maxlen:
+            return None
+        return self._sma20_sum / self._sma20.maxlen
+
+    @property
+    def sma_50(self) -> Optional[float]:
+        if len(self._sma50) < self._sma50.maxlen:
+            return None
+        return self._sma50_sum / self._sma50.maxlen
+
+    @property
+    def rsi(self) -> Optional[float]:
+        if len(self._moves) < self._moves.maxlen:
+            return None
+        if self._loss_sum == 0:
+            return 100.0
+        rs = self._gain_sum / self._loss_sum  # window lengths cancel
+        return 100 - (100 / (1 + rs))
+
+    @property
+    def vwap(self) -> Optional[float]:
+        if self._volume_sum <= 0:
+            return None
+        return self._pv_sum / self._volume_sum
+
 class MarketDataProcessor:
     """Main market data processor for real-time data handling"""
     
@@ -30,12 +124,22 @@ class MarketDataProcessor:
         self.redis_client: Optional[RedisClient] = None
         self.websocket_manager: Optional[WebSocketManager] = None
         
+        # Shared pooled HTTP session: providers reuse keep-alive connections
+        # instead of paying a TCP+TLS handshake per request. With the
+        # h2 extra installed, concurrent requests to one provider
+        # multiplex as HTTP/2 streams over a single connection
+        self.http_session = httpx.AsyncClient(
+            timeout=10.0,
+            http2=HTTP2_AVAILABLE,
+            limits=httpx.Limits(max_keepalive_connections=100, max_connections=200)
+        )
+
         # Data providers
-        self.alpha_vantage = AlphaVantageProvider()
-        self.iex_cloud = IEXCloudProvider()
-        self.yahoo_finance = YahooFinanceProvider()
-        self.eodhd = EODHDProvider()
-        self.polygon = PolygonProvider()
+        self.alpha_vantage = AlphaVantageProvider(session=self.http_session)
+        self.iex_cloud = IEXCloudProvider(session=self.http_session)
+        self.yahoo_finance = YahooFinanceProvider(session=self.http_session)
+        self.eodhd = EODHDProvider(session=self.http_session)
+        self.polygon = PolygonProvider(session=self.http_session)
         
         # Processors
         self.technical_indicators = TechnicalIndicators()
@@ -44,34 +148,91 @@ class MarketDataProcessor:
         # State
         self.is_running = False
         self.processing_task = None
+        # Pipeline stages hand batches through bounded queues so provider
+        # I/O, CPU enrichment and database writes overlap across ticks;
+        # the bounds give natural backpressure when a stage falls behind
+        self._fetch_q: asyncio.Queue = asyncio.Queue(maxsize=4)
+        self._store_q: asyncio.Queue = asyncio.Queue(maxsize=4)
+        self._pipeline_tasks: List[asyncio.Task] = []
+        # Bound concurrent per-symbol fetches: each one can race every
+        # provider, so without a cap a large symbol set schedules thousands
+        # of in-flight coroutines at once
+        self._symbol_sem = asyncio.Semaphore(settings.MAX_INFLIGHT_SYMBOLS)
         self.symbols = set(settings.DEFAULT_SYMBOLS)
         self.last_prices = {}
+        self.last_volumes = {}
         self.price_history = {}
+        self._indicator_pool = {}  # symbol -> reused indicators dict
+        self._aggregators = {}  # symbol -> SymbolAggregator rolling state
+        self.latest_snapshot = {}  # symbol -> overview entry, updated per tick
+        self.market_summary = {
+            "gainers": 0,
+            "losers": 0,
+            "unchanged": 0,
+            "total_volume": 0
+        }
         self.processing_stats = {
             "total_updates": 0,
             "last_update": None,
             "errors": 0,
-            "latency_ms": 0
+            "latency_ms": 0,
+            "skipped_unchanged": 0,
+            "overruns": 0
         }
         
         # Performance tracking
         self.update_frequency = settings.UPDATE_FREQUENCY / 1000.0  # Convert to seconds
         self.batch_size = settings.BATCH_SIZE
+
+        # Adaptive batch sizing (AIMD): grow while cycles come in under the
+        # latency budget, halve on overshoot or new errors
+        self.min_batch_size = 4
+        self.max_batch_size = max(settings.BATCH_SIZE, settings.MAX_SYMBOLS)
+        self.target_latency_ms = settings.TARGET_LATENCY_MS
+        self._latency_ema_ms = 0.0
+        self._last_error_count = 0
+
+        # Symbol batches are cached and rebuilt only when the tracked set
+        # or the batch size changes, not on every cycle
+        self._symbol_batches: List[List[str]] = []
+        self._rebuild_batches()
         
     async def start(self):
-        """Start the market data processor"""
+        """Run the market data processor
+
+        Spawns the pipeline and then stays alive for its lifetime, so
+        a supervisor awaiting this coroutine observes a crash in any
+        of the loops instead of completing at startup.
+        """
         try:
             logger.info("Starting Market Data Processor...")
             self.is_running = True
-            
-            # Start processing task
+
+            # Start the pipeline: one fetch producer plus the enrichment
+            # and write consumers
             self.processing_task = asyncio.create_task(self._process_loop())
-            
+            self._pipeline_tasks = [
+                asyncio.create_task(self._enrich_loop()),
+                asyncio.create_task(self._write_loop())
+            ]
+
             logger.info("Market Data Processor started successfully")
-            
+
         except Exception as e:
             logger.error(f"Failed to start Market Data Processor: {e}")
             raise
+
+        tasks = (self.processing_task, *self._pipeline_tasks)
+        try:
+            await asyncio.gather(*tasks)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # One loop crashed; take the survivors down so a restart
+            # begins from a clean slate
+            for task in tasks:
+                task.cancel()
+            raise
     
     async def stop(self):
         """Stop the market data processor"""
@@ -85,82 +246,263 @@ class MarketDataProcessor:
                     await self.processing_task
                 except asyncio.CancelledError:
                     pass
-            
+
+            for task in self._pipeline_tasks:
+                task.cancel()
+            if self._pipeline_tasks:
+                await asyncio.gather(*self._pipeline_tasks, return_exceptions=True)
+                self._pipeline_tasks = []
+
+            # Providers normally ride the shared session, but any that
+            # fell back to an owned client close it here; lifetimes end
+            # with the app, not with a request
+            for provider in (
+                self.alpha_vantage, self.iex_cloud, self.yahoo_finance,
+                self.eodhd, self.polygon
+            ):
+                await provider.close()
+            await self.http_session.aclose()
+
             logger.info("Market Data Processor stopped")
             
         except Exception as e:
             logger.error(f"Error stopping Market Data Processor: {e}")
     
     async def _process_loop(self):
-        """Main processing loop"""
+        """Main processing loop
+
+        Runs on a monotonic deadline schedule: sleeping until the next
+        deadline instead of a fixed interval after the work keeps the
+        tick period at update_frequency regardless of how long a cycle
+        takes. When a cycle overruns badly the schedule skips ahead
+        rather than flooding catch-up ticks.
+        """
+        next_deadline = time.monotonic() + self.update_frequency
+
         while self.is_running:
             try:
-                start_time = time.time()
-                
+                # Monotonic clock: immune to wall-clock adjustments and
+                # cheaper than building datetime objects per cycle
+                start_time = time.monotonic_ns()
+
                 # Process all symbols
                 await self._process_symbols()
-                
-                # Update processing stats
-                processing_time = (time.time() - start_time) * 1000  # Convert to milliseconds
+
+                # Update processing stats; last_update stays a raw epoch
+                # float and is ISO-formatted lazily in get_processing_stats
+                processing_time = (time.monotonic_ns() - start_time) / 1e6
                 self.processing_stats["latency_ms"] = processing_time
-                self.processing_stats["last_update"] = datetime.utcnow().isoformat()
-                
-                # Wait for next update cycle
-                await asyncio.sleep(self.update_frequency)
-                
+                self.processing_stats["last_update"] = time.time()
+
+                # Retune the batch size from the observed cycle latency
+                self._adapt_batch_size(processing_time)
+
+                # Sleep to the next deadline; if we fell more than two
+                # periods behind, drop the missed ticks instead of
+                # burst-executing them
+                now = time.monotonic()
+                if now > next_deadline + 2 * self.update_frequency:
+                    self.processing_stats["overruns"] += 1
+                    next_deadline = now + self.update_frequency
+                await asyncio.sleep(max(0.0, next_deadline - now))
+                next_deadline += self.update_frequency
+
             except asyncio.CancelledError:
                 break
             except Exception as e:
-                logger.error(f"Error in processing loop: {e}")
+                logger.error("Error in processing loop: %s", e)
                 self.processing_stats["errors"] += 1
                 await asyncio.sleep(1)  # Wait before retrying
+                next_deadline = time.monotonic() + self.update_frequency
     
+    def _adapt_batch_size(self, processing_time_ms: float):
+        """AIMD controller keeping cycle latency near the configured budget
+
+        Additive increase while a smoothed latency stays comfortably under
+        target_latency_ms and no new errors arrived; multiplicative
+        decrease on overshoot or errors. The EMA denoises single slow
+        cycles so one provider hiccup does not collapse the batch size.
+        """
+        if self._latency_ema_ms == 0.0:
+            self._latency_ema_ms = processing_time_ms
+        else:
+            self._latency_ema_ms = 0.8 * self._latency_ema_ms + 0.2 * processing_time_ms
+
+        errors = self.processing_stats["errors"]
+        new_errors = errors > self._last_error_count
+        self._last_error_count = errors
+
+        old_batch_size = self.batch_size
+        if new_errors or self._latency_ema_ms > self.target_latency_ms:
+            self.batch_size = max(self.min_batch_size, self.batch_size // 2)
+        elif self._latency_ema_ms < self.target_latency_ms * 0.8:
+            self.batch_size = min(self.max_batch_size, self.batch_size + 4)
+
+        if self.batch_size != old_batch_size:
+            self._rebuild_batches()
+
+    def _rebuild_batches(self):
+        """Recompute the cached symbol batches
+
+        Called from add_symbol/remove_symbol and when the adaptive
+        controller changes batch_size; self.symbols stays a set purely
+        for O(1) membership checks.
+        """
+        symbols_list = list(self.symbols)
+        self._symbol_batches = [symbols_list[i:i + self.batch_size]
+                                for i in range(0, len(symbols_list), self.batch_size)]
+
     async def _process_symbols(self):
-        """Process all symbols for market data updates"""
+        """Fetch stage: pull quotes for every batch and feed the pipeline
+
+        Only provider I/O happens here; enrichment and storage run in
+        their own consumers, so fetching tick N+1 overlaps with the CPU
+        and database work for tick N.
+        """
         try:
-            # Process symbols in batches for performance
-            symbol_batches = [list(self.symbols)[i:i + self.batch_size] 
-                            for i in range(0, len(self.symbols), self.batch_size)]
-            
-            for batch in symbol_batches:
-                # Process batch concurrently
-                tasks = [self._process_symbol(symbol) for symbol in batch]
-                await asyncio.gather(*tasks, return_exceptions=True)
-                
+            for batch in self._symbol_batches:
+                quotes = await self._fetch_market_data_batch(batch)
+                await self._fetch_q.put((batch, quotes))
+
         except Exception as e:
-            logger.error(f"Failed to process symbols: {e}")
+            logger.error("Failed to process symbols: %s", e)
             raise
-    
-    async def _process_symbol(self, symbol: str):
-        """Process market data for a single symbol"""
-        try:
-            # Get market data from providers
-            market_data = await self._fetch_market_data(symbol)
-            
-            if not market_data:
-                logger.warning(f"No market data received for {symbol}")
-                return
-            
-            # Process and enrich data
-            processed_data = await self._process_market_data(symbol, market_data)
-            
-            # Store data
-            await self._store_market_data(symbol, processed_data)
-            
-            # Broadcast updates
-            await self._broadcast_updates(symbol, processed_data)
-            
-            # Update processing stats
-            self.processing_stats["total_updates"] += 1
-            
-        except Exception as e:
-            logger.error(f"Failed to process symbol {symbol}: {e}")
-            self.processing_stats["errors"] += 1
+
+    async def _enrich_loop(self):
+        """Enrichment stage: CPU-only indicator and anomaly work"""
+        while True:
+            symbols, quotes = await self._fetch_q.get()
+            try:
+                processed = {}
+                for symbol in symbols:
+                    market_data = quotes.get(symbol)
+                    if not market_data:
+                        logger.warning("No market data received for %s", symbol)
+                        continue
+
+                    # Early-exit on repeated quotes (common outside market
+                    # hours): identical price and volume mean the indicators,
+                    # stores and broadcasts would all be no-ops
+                    price = market_data.get("price", 0)
+                    volume = market_data.get("volume", 0)
+                    if (price == self.last_prices.get(symbol)
+                            and volume == self.last_volumes.get(symbol)):
+                        self.processing_stats["skipped_unchanged"] += 1
+                        continue
+                    self.last_volumes[symbol] = volume
+
+                    processed[symbol] = await self._process_market_data(symbol, market_data)
+
+                if processed:
+                    await self._store_q.put(processed)
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Failed to enrich batch %s: %s", symbols, e)
+                self.processing_stats["errors"] += 1
+
+    async def _write_loop(self):
+        """Write stage: batched database writes and broadcasts"""
+        while True:
+            processed = await self._store_q.get()
+            try:
+                # One InfluxDB write per batch instead of one per symbol
+                if self.influx_client:
+                    try:
+                        await self.influx_client.write_batch_market_data(list(processed.values()))
+                    except Exception as e:
+                        logger.error("Failed to write batch to InfluxDB: %s", e)
+                        self.processing_stats["errors"] += 1
+
+                # Redis pipelines for the batch run concurrently
+                if self.redis_client:
+                    await asyncio.gather(*[
+                        self.redis_client.write_batch(symbol, data, data.get("indicators"))
+                        for symbol, data in processed.items()
+                    ], return_exceptions=True)
+
+                # Broadcast updates (enqueue only, no await)
+                for symbol, data in processed.items():
+                    self._broadcast_updates(symbol, data)
+                    self.processing_stats["total_updates"] += 1
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Failed to write batch: %s", e)
+                self.processing_stats["errors"] += 1
+
+    async def _fetch_market_data_batch(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Fetch quotes for a batch of symbols
+
+        Providers exposing a multi-symbol get_quotes endpoint serve the
+        whole batch in one API call; any symbols they miss fall back to
+        the per-symbol provider race, run concurrently.
+        """
+        quotes: Dict[str, Dict[str, Any]] = {}
+        remaining = list(symbols)
+
+        for provider, provider_name in self._batch_capable_providers():
+            if not remaining:
+                break
+            try:
+                batch = await provider.get_quotes(remaining)
+            except Exception as e:
+                logger.debug("Batch provider %s failed: %s", provider_name, e)
+                continue
+
+            if batch:
+                # One timestamp per provider batch, not one per symbol
+                now = datetime.utcnow()
+                for symbol, data in batch.items():
+                    if data:
+                        data["provider"] = provider_name
+                        data["symbol"] = symbol
+                        data["timestamp"] = now
+                        quotes[symbol] = data
+                remaining = [s for s in remaining if s not in quotes]
+
+        if remaining:
+            results = await asyncio.gather(
+                *[self._fetch_market_data(symbol) for symbol in remaining],
+                return_exceptions=True
+            )
+            # BaseException also screens out a CancelledError captured
+            # by return_exceptions, which would otherwise pass an
+            # Exception-only check and be stored as a quote
+            for symbol, data in zip(remaining, results):
+                if data and not isinstance(data, BaseException):
+                    quotes[symbol] = data
+
+        return quotes
+
+    def _batch_capable_providers(self) -> List[tuple]:
+        """Providers that implement a multi-symbol get_quotes endpoint"""
+        providers = [
+            (self.polygon, "Polygon.io"),
+            (self.eodhd, "EODHD"),
+            (self.yahoo_finance, "Yahoo Finance"),
+            (self.alpha_vantage, "Alpha Vantage"),
+            (self.iex_cloud, "IEX Cloud")
+        ]
+        return [(p, name) for p, name in providers if hasattr(p, "get_quotes")]
     
     async def _fetch_market_data(self, symbol: str) -> Optional[Dict[str, Any]]:
-        """Fetch market data from multiple providers"""
+        """Fetch market data by racing all providers concurrently
+
+        Admission is gated by a semaphore so the number of in-flight
+        provider races stays bounded regardless of batch size.
+        """
+        async with self._symbol_sem:
+            return await self._race_providers(symbol)
+
+    async def _race_providers(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Race every provider for one symbol, first truthy quote wins"""
         try:
-            # Try different providers in order of preference
+            # Race every provider instead of paying each failed provider's
+            # full latency in sequence: overall latency becomes the fastest
+            # successful provider instead of the sum of the failed ones
             providers = [
                 (self.polygon, "Polygon.io"),
                 (self.eodhd, "EODHD"),
@@ -168,100 +510,160 @@ class MarketDataProcessor:
                 (self.alpha_vantage, "Alpha Vantage"),
                 (self.iex_cloud, "IEX Cloud")
             ]
-            
-            for provider, provider_name in providers:
-                try:
-                    data = await provider.get_quote(symbol)
-                    if data:
-                        data["provider"] = provider_name
-                        data["symbol"] = symbol
-                        data["timestamp"] = datetime.utcnow()
-                        return data
-                except Exception as e:
-                    logger.debug(f"Provider {provider_name} failed for {symbol}: {e}")
-                    continue
-            
-            return None
-            
+
+            tasks = {
+                asyncio.create_task(provider.get_quote(symbol)): provider_name
+                for provider, provider_name in providers
+            }
+            pending = set(tasks)
+            result = None
+
+            try:
+                while pending and result is None:
+                    done, pending = await asyncio.wait(
+                        pending, return_when=asyncio.FIRST_COMPLETED
+                    )
+
+                    for task in done:
+                        provider_name = tasks[task]
+                        try:
+                            data = task.result()
+                        except Exception as e:
+                            logger.debug("Provider %s failed for %s: %s", provider_name, symbol, e)
+                            continue
+
+                        if data:
+                            data["provider"] = provider_name
+                            data["symbol"] = symbol
+                            data["timestamp"] = datetime.utcnow()
+                            result = data
+                            break
+            finally:
+                # Cancel the slower providers once a winner is in
+                for task in pending:
+                    task.cancel()
+                if pending:
+                    await asyncio.gather(*pending, return_exceptions=True)
+
+            return result
+
         except Exception as e:
-            logger.error(f"Failed to fetch market data for {symbol}: {e}")
+            logger.error("Failed to fetch market data for %s: %s", symbol, e)
             return None
     
     async def _process_market_data(self, symbol: str, market_data: Dict[str, Any]) -> Dict[str, Any]:
         """Process and enrich market data with technical indicators"""
         try:
-            processed_data = market_data.copy()
-            
-            # Calculate price change
+            # Enrich the provider dict in place: it is freshly allocated
+            # per fetch, so copying it again per tick buys nothing
+            processed_data = market_data
+
+            # Calculate price change; values stay full precision here and
+            # are trimmed for display by the consumer, not the hot loop
             if symbol in self.last_prices:
                 last_price = self.last_prices[symbol]
                 current_price = market_data.get("price", 0)
-                
+
                 if last_price > 0:
                     change = current_price - last_price
                     change_percent = (change / last_price) * 100
-                    
-                    processed_data["change"] = round(change, 4)
-                    processed_data["change_percent"] = round(change_percent, 2)
+
+                    processed_data["change"] = change
+                    processed_data["change_percent"] = change_percent
                     processed_data["direction"] = "up" if change > 0 else "down" if change < 0 else "unchanged"
             
             # Update last price
             self.last_prices[symbol] = market_data.get("price", 0)
             
-            # Add to price history
+            # Add to price history (fixed-capacity columnar ring buffer:
+            # the append overwrites the oldest slot, so no truncation pass)
             if symbol not in self.price_history:
-                self.price_history[symbol] = []
-            
-            self.price_history[symbol].append({
-                "price": market_data.get("price", 0),
-                "volume": market_data.get("volume", 0),
-                "timestamp": market_data.get("timestamp")
-            })
-            
-            # Keep only recent history (last 1000 points)
-            if len(self.price_history[symbol]) > 1000:
-                self.price_history[symbol] = self.price_history[symbol][-1000:]
-            
-            # Calculate technical indicators if we have enough data
-            if len(self.price_history[symbol]) >= 20:
-                prices = [point["price"] for point in self.price_history[symbol]]
-                volumes = [point["volume"] for point in self.price_history[symbol]]
-                
-                # Calculate basic indicators
-                sma_20 = self.technical_indicators.calculate_sma(prices, 20)
-                sma_50 = self.technical_indicators.calculate_sma(prices, 50) if len(prices) >= 50 else None
-                
-                processed_data["indicators"] = {
-                    "sma_20": round(sma_20, 4) if sma_20 else None,
-                    "sma_50": round(sma_50, 4) if sma_50 else None,
-                    "price_above_sma_20": sma_20 and market_data.get("price", 0) > sma_20,
-                    "price_above_sma_50": sma_50 and market_data.get("price", 0) > sma_50
-                }
-                
-                # Calculate RSI if we have enough data
-                if len(prices) >= 14:
-                    rsi = self.technical_indicators.calculate_rsi(prices, 14)
-                    processed_data["indicators"]["rsi"] = round(rsi, 2) if rsi else None
-                
-                # Calculate VWAP
-                vwap = self.technical_indicators.calculate_vwap(prices, volumes)
-                processed_data["indicators"]["vwap"] = round(vwap, 4) if vwap else None
+                self.price_history[symbol] = PriceBuffer(1000)
+
+            history = self.price_history[symbol]
+            history.append(
+                market_data.get("price", 0),
+                market_data.get("volume", 0),
+                market_data.get("timestamp")
+            )
+
+            # Push the tick into the per-symbol aggregator (O(1)
+            # rolling-sum updates instead of O(window) recomputation)
+            aggregator = self._aggregators.get(symbol)
+            if aggregator is None:
+                aggregator = self._aggregators[symbol] = SymbolAggregator()
+            aggregator.push(market_data.get("price", 0), market_data.get("volume", 0))
+
+            # Report indicators once we have enough data
+            if len(history) >= 20:
+                sma_20 = aggregator.sma_20
+                sma_50 = aggregator.sma_50
+
+                # Reuse one indicators dict per symbol instead of allocating
+                # a fresh mapping every tick; values are overwritten in place
+                indicators = self._indicator_pool.get(symbol)
+                if indicators is None:
+                    indicators = self._indicator_pool[symbol] = {}
+
+                indicators["sma_20"] = sma_20
+                indicators["sma_50"] = sma_50
+                indicators["price_above_sma_20"] = bool(sma_20 and market_data.get("price", 0) > sma_20)
+                indicators["price_above_sma_50"] = bool(sma_50 and market_data.get("price", 0) > sma_50)
+                indicators["rsi"] = aggregator.rsi
+                indicators["vwap"] = aggregator.vwap
+
+                processed_data["indicators"] = indicators
             
             # Detect anomalies
-            if len(self.price_history[symbol]) >= 20:
+            if len(history) >= 20:
                 anomaly_score = self.anomaly_detector.detect_anomaly(
-                    symbol, 
-                    self.price_history[symbol][-20:],
+                    symbol,
+                    history.tail(20),
                     processed_data
                 )
                 processed_data["anomaly_score"] = anomaly_score
-            
+
+            # Keep the market overview aggregate current
+            self._update_market_overview(symbol, processed_data)
+
             return processed_data
             
         except Exception as e:
-            logger.error(f"Failed to process market data for {symbol}: {e}")
+            logger.error("Failed to process market data for %s: %s", symbol, e)
             return market_data
     
+    def _update_market_overview(self, symbol: str, data: Dict[str, Any]):
+        """Fold one processed tick into the in-memory market overview
+
+        Retires the symbol's previous contribution to the summary counters
+        and adds the new one, so get_market_overview never has to
+        reaggregate from Redis.
+        """
+        old_entry = self.latest_snapshot.get(symbol)
+        if old_entry:
+            self.market_summary[self._direction_bucket(old_entry["direction"])] -= 1
+            self.market_summary["total_volume"] -= old_entry["volume"]
+
+        entry = {
+            "price": data.get("price", 0),
+            "change": data.get("change", 0),
+            "change_percent": data.get("change_percent", 0),
+            "volume": data.get("volume", 0),
+            "direction": data.get("direction", "unchanged")
+        }
+        self.latest_snapshot[symbol] = entry
+        self.market_summary[self._direction_bucket(entry["direction"])] += 1
+        self.market_summary["total_volume"] += entry["volume"]
+
+    @staticmethod
+    def _direction_bucket(direction: str) -> str:
+        """Map a tick direction to its market summary counter"""
+        if direction == "up":
+            return "gainers"
+        if direction == "down":
+            return "losers"
+        return "unchanged"
+
     async def _store_market_data(self, symbol: str, data: Dict[str, Any]):
         """Store market data in databases"""
         try:
@@ -269,31 +671,27 @@ class MarketDataProcessor:
             if self.influx_client:
                 await self.influx_client.write_market_data(data)
             
-            # Store in Redis
+            # Store in Redis: latest price, history entry and indicators
+            # coalesce into a single pipelined round-trip
             if self.redis_client:
-                await self.redis_client.set_latest_price(symbol, data)
-                await self.redis_client.add_to_price_history(symbol, data)
-                
-                # Store technical indicators separately
-                if "indicators" in data:
-                    for indicator_name, value in data["indicators"].items():
-                        if value is not None:
-                            await self.redis_client.set_technical_indicator(
-                                symbol, indicator_name, 20, {"value": value}
-                            )
+                await self.redis_client.write_batch(symbol, data, data.get("indicators"))
             
         except Exception as e:
-            logger.error(f"Failed to store market data for {symbol}: {e}")
+            logger.error("Failed to store market data for %s: %s", symbol, e)
             raise
     
-    async def _broadcast_updates(self, symbol: str, data: Dict[str, Any]):
-        """Broadcast market data updates via WebSocket"""
+    def _broadcast_updates(self, symbol: str, data: Dict[str, Any]):
+        """Queue market data updates for WebSocket broadcast
+
+        Hands the update to the manager's broadcast queue without awaiting
+        the fan-out, so slow subscribers cannot back up the processing loop.
+        """
         try:
             if self.websocket_manager:
-                await self.websocket_manager.broadcast_market_data(symbol, data)
-            
+                self.websocket_manager.enqueue_broadcast(symbol, data)
+
         except Exception as e:
-            logger.error(f"Failed to broadcast updates for {symbol}: {e}")
+            logger.error("Failed to broadcast updates for %s: %s", symbol, e)
     
     async def add_symbol(self, symbol: str):
         """Add a new symbol to track"""
@@ -303,9 +701,11 @@ class MarketDataProcessor:
                 logger.info(f"Added symbol to tracking: {symbol}")
                 
                 # Initialize price history
-                self.price_history[symbol] = []
+                self.price_history[symbol] = PriceBuffer(1000)
                 self.last_prices[symbol] = 0
-                
+                self._aggregators[symbol] = SymbolAggregator()
+                self._rebuild_batches()
+
                 return True
             return False
             
@@ -322,9 +722,23 @@ class MarketDataProcessor:
                 # Clean up data
                 if symbol in self.last_prices:
                     del self.last_prices[symbol]
+                if symbol in self.last_volumes:
+                    del self.last_volumes[symbol]
                 if symbol in self.price_history:
                     del self.price_history[symbol]
-                
+                if symbol in self._indicator_pool:
+                    del self._indicator_pool[symbol]
+                if symbol in self._aggregators:
+                    del self._aggregators[symbol]
+
+                # Retire the symbol's contribution to the market overview
+                old_entry = self.latest_snapshot.pop(symbol, None)
+                if old_entry:
+                    self.market_summary[self._direction_bucket(old_entry["direction"])] -= 1
+                    self.market_summary["total_volume"] -= old_entry["volume"]
+
+                self._rebuild_batches()
+
                 logger.info(f"Removed symbol from tracking: {symbol}")
                 return True
             return False
@@ -339,12 +753,16 @@ class MarketDataProcessor:
     
     def get_processing_stats(self) -> Dict[str, Any]:
         """Get processing statistics"""
-        return self.processing_stats.copy()
+        stats = self.processing_stats.copy()
+        # ISO-format the raw epoch timestamp only at this API boundary
+        if stats.get("last_update") is not None:
+            stats["last_update"] = datetime.utcfromtimestamp(stats["last_update"]).isoformat()
+        return stats
     
     def get_symbol_price_history(self, symbol: str, limit: int = 100) -> List[Dict[str, Any]]:
         """Get price history for a symbol"""
         if symbol in self.price_history:
-            return self.price_history[symbol][-limit:]
+            return self.price_history[symbol].tail(limit).to_records()
         return []
     
     async def set_influx_client(self, influx_client: InfluxDBClient):
@@ -360,43 +778,19 @@ class MarketDataProcessor:
         self.websocket_manager = websocket_manager
     
     async def get_market_overview(self) -> Dict[str, Any]:
-        """Get market overview for all tracked symbols"""
+        """Get market overview for all tracked symbols
+
+        Served from the in-memory aggregate maintained tick by tick in
+        _update_market_overview, so the query costs O(1) instead of one
+        Redis round-trip per tracked symbol.
+        """
         try:
-            overview = {
+            return {
                 "total_symbols": len(self.symbols),
-                "symbols": {},
-                "market_summary": {
-                    "gainers": 0,
-                    "losers": 0,
-                    "unchanged": 0,
-                    "total_volume": 0
-                }
+                "symbols": dict(self.latest_snapshot),
+                "market_summary": dict(self.market_summary)
             }
-            
-            for symbol in self.symbols:
-                latest_data = await self.redis_client.get_latest_price(symbol)
-                if latest_data:
-                    overview["symbols"][symbol] = {
-                        "price": latest_data.get("price", 0),
-                        "change": latest_data.get("change", 0),
-                        "change_percent": latest_data.get("change_percent", 0),
-                        "volume": latest_data.get("volume", 0),
-                        "direction": latest_data.get("direction", "unchanged")
-                    }
-                    
-                    # Update market summary
-                    direction = latest_data.get("direction", "unchanged")
-                    if direction == "up":
-                        overview["market_summary"]["gainers"] += 1
-                    elif direction == "down":
-                        overview["market_summary"]["losers"] += 1
-                    else:
-                        overview["market_summary"]["unchanged"] += 1
-                    
-                    overview["market_summary"]["total_volume"] += latest_data.get("volume", 0)
-            
-            return overview
-            
+
         except Exception as e:
             logger.error(f"Failed to get market overview: {e}")
             return {}
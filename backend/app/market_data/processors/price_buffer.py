@@ -0,0 +1,85 @@
+"""
+Columnar price history buffer shared by the market data processors
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+class PriceBuffer:
+    """Fixed-capacity ring buffer storing price history as parallel arrays
+
+    Replaces the list-of-dicts history layout: prices, volumes and
+    timestamps live in separate contiguous arrays, so every reduction the
+    detectors and indicators run (mean, std, slices) operates on a view
+    instead of a per-point dict lookup.
+    """
+
+    def __init__(self, capacity: int = 1000):
+        self.capacity = capacity
+        self.prices = np.zeros(capacity, dtype=np.float64)
+        self.volumes = np.zeros(capacity, dtype=np.float64)
+        self.timestamps = np.zeros(capacity, dtype="datetime64[ns]")
+        self._idx = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, price: float, volume: float, timestamp: Optional[Any] = None):
+        """Append one point, overwriting the oldest once at capacity"""
+        self.prices[self._idx] = price
+        self.volumes[self._idx] = volume
+        if timestamp is not None:
+            self.timestamps[self._idx] = np.datetime64(timestamp)
+        self._idx = (self._idx + 1) % self.capacity
+        if self._size < self.capacity:
+            self._size += 1
+
+    def view(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Get (prices, volumes, timestamps) in chronological order
+
+        Returns zero-copy views while the buffer has not wrapped; after
+        wrapping the two segments are stitched into new arrays.
+        """
+        if self._size < self.capacity:
+            return (
+                self.prices[:self._size],
+                self.volumes[:self._size],
+                self.timestamps[:self._size]
+            )
+
+        order = np.concatenate([np.arange(self._idx, self.capacity), np.arange(self._idx)])
+        return self.prices[order], self.volumes[order], self.timestamps[order]
+
+    def tail(self, n: int) -> "PriceBuffer":
+        """Get a read-only buffer over the most recent n points
+
+        The returned buffer shares the underlying arrays where possible and
+        must not be appended to.
+        """
+        prices, volumes, timestamps = self.view()
+        window = PriceBuffer.__new__(PriceBuffer)
+        window.prices = prices[-n:]
+        window.volumes = volumes[-n:]
+        window.timestamps = timestamps[-n:]
+        window._size = window.prices.shape[0]
+        window.capacity = window._size + 1  # view() stays on the unwrapped path
+        window._idx = window._size
+        return window
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        """Convert back to the legacy list-of-dicts layout (API boundaries only)"""
+        prices, volumes, timestamps = self.view()
+        return [
+            {"price": float(p), "volume": float(v), "timestamp": t}
+            for p, v, t in zip(prices, volumes, timestamps)
+        ]
+
+    @classmethod
+    def from_list_of_dicts(cls, price_history: List[Dict[str, Any]], capacity: int = 1000) -> "PriceBuffer":
+        """Build a buffer from the legacy list-of-dicts layout"""
+        buffer = cls(capacity=max(capacity, len(price_history)))
+        for point in price_history:
+            buffer.append(point.get("price", 0), point.get("volume", 0), point.get("timestamp"))
+        return buffer
@@ -0,0 +1,45 @@
+"""
+Vectorized numeric kernels for the technical indicators
+"""
+
+import numpy as np
+
+def obv_kernel(prices: np.ndarray, volumes: np.ndarray) -> float:
+    """On-Balance Volume as a single sign/dot pass
+
+    np.sign of the price deltas yields +1/-1/0 per bar, so the running
+    add/subtract/skip loop collapses to one dot product against the
+    volumes. The kernels in this module stay free of Python object
+    churn so they could be handed to a JIT compiler unchanged if a
+    native build step is ever added.
+    """
+    return float(np.dot(np.sign(np.diff(prices)), volumes[1:]))
+
+def obv_update(prev_obv: float, prev_price: float, price: float, volume: float) -> float:
+    """Fold one bar into a running OBV, branchlessly
+
+    The (price > prev) - (price < prev) boolean arithmetic yields the
+    same +1/-1/0 factor as np.sign without a data-dependent branch, so
+    streaming callers update in O(1) per tick.
+    """
+    return prev_obv + ((price > prev_price) - (price < prev_price)) * volume
+
+def atr_kernel(
+    highs: np.ndarray,
+    lows: np.ndarray,
+    closes: np.ndarray,
+    period: int
+) -> float:
+    """Average True Range with the true-range pass fused into array ops
+
+    Computes all three TR candidates element-wise and reduces the
+    trailing window in one mean, instead of growing a Python list of
+    true ranges bar by bar.
+    """
+    prev_close = closes[:-1]
+    high, low = highs[1:], lows[1:]
+    true_range = np.maximum(
+        high - low,
+        np.maximum(np.abs(high - prev_close), np.abs(low - prev_close))
+    )
+    return float(true_range[-period:].mean())
@@ -3,9 +3,12 @@ Alpha Vantage market data provider
 """
 
 import asyncio
+import json
 import logging
+import time
 from typing import Dict, Optional, Any
 import httpx
+import pandas as pd
 from datetime import datetime
 
 from app.config import settings
@@ -15,36 +18,56 @@ logger = logging.getLogger(__name__)
 class AlphaVantageProvider:
     """Alpha Vantage API provider for market data"""
     
-    def __init__(self):
+    def __init__(self, session: Optional[httpx.AsyncClient] = None):
         self.api_key = settings.ALPHA_VANTAGE_API_KEY
         self.base_url = "https://www.alphavantage.co/query"
         self.rate_limit = 5  # 5 calls per minute (free tier)
-        self.last_call_time = 0
+        self.min_call_interval = 12.0  # seconds between calls
+        # Monotonic seconds: immune to NTP adjustments and cheaper than
+        # constructing a datetime per call
+        self.last_call_time = 0.0
         self.call_count = 0
-        self.reset_time = datetime.now().timestamp()
-        
+        self.reset_time = time.monotonic()
+        self._rate_lock = asyncio.Lock()
+        self._next_slot = 0.0
+        self.quote_cache_ttl = 15.0  # seconds; staleness bound for repeat quotes
+        self._quote_cache: Dict[str, tuple] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.timeout = 10.0
+        self.session = session
+        self._owns_session = session is None
+
         if not self.api_key:
             logger.warning("Alpha Vantage API key not configured")
+
+    async def _get_session(self) -> httpx.AsyncClient:
+        """Get the shared HTTP session, or lazily create an owned one"""
+        if self.session is None:
+            self.session = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(max_keepalive_connections=10)
+            )
+        return self.session
     
-    async def _check_rate_limit(self) -> bool:
-        """Check if we can make an API call"""
-        current_time = datetime.now().timestamp()
-        
-        # Reset counter every minute
-        if current_time - self.reset_time >= 60:
-            self.call_count = 0
-            self.reset_time = current_time
-        
-        # Check if we've exceeded rate limit
-        if self.call_count >= self.rate_limit:
-            logger.warning("Alpha Vantage rate limit exceeded")
-            return False
-        
-        # Check minimum time between calls
-        if current_time - self.last_call_time < 12:  # 12 seconds between calls
-            return False
-        
-        return True
+    async def _acquire_rate_slot(self) -> None:
+        """Wait for the next available rate-limit slot
+
+        The old polling check returned False when throttled, silently
+        dropping the request. Instead, callers sleep until the next
+        12-second slot and claim it under the lock (which also
+        enforces the 5-per-minute cap) only once the wait has elapsed,
+        so a caller cancelled mid-sleep — every losing racer in the
+        provider race is — consumes nothing from the budget. Uses the
+        loop's monotonic clock, which is immune to wall-clock jumps.
+        """
+        while True:
+            async with self._rate_lock:
+                now = asyncio.get_running_loop().time()
+                if self._next_slot <= now:
+                    self._next_slot = now + self.min_call_interval
+                    return
+                wait = self._next_slot - now
+            await asyncio.sleep(wait)
     
     async def _make_request(self, params: Dict[str, str]) -> Optional[Dict[str, Any]]:
         """Make API request to Alpha Vantage"""
@@ -53,44 +76,94 @@ class AlphaVantageProvider:
                 logger.warning("Alpha Vantage API key not configured")
                 return None
             
-            # Check rate limit
-            if not await self._check_rate_limit():
-                return None
-            
+            # Wait for a rate-limit slot instead of dropping the request
+            await self._acquire_rate_slot()
+
             # Add API key to params
             params["apikey"] = self.api_key
             
-            # Make request
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.get(self.base_url, params=params)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    
-                    # Check for API errors
-                    if "Error Message" in data:
-                        logger.error(f"Alpha Vantage API error: {data['Error Message']}")
-                        return None
-                    
-                    if "Note" in data:
-                        logger.warning(f"Alpha Vantage API note: {data['Note']}")
-                        return None
-                    
-                    # Update rate limit tracking
-                    self.last_call_time = datetime.now().timestamp()
-                    self.call_count += 1
-                    
-                    return data
-                else:
-                    logger.error(f"Alpha Vantage API request failed: {response.status_code}")
+            # Make request on the pooled session (keep-alive, no per-call
+            # TCP/TLS handshake)
+            client = await self._get_session()
+            response = await client.get(self.base_url, params=params, timeout=self.timeout)
+
+            if response.status_code == 200:
+                # Decode the raw bytes directly; full daily responses run
+                # to ~500 KB and this skips httpx's charset detection
+                data = json.loads(response.content)
+
+                # Check for API errors
+                if "Error Message" in data:
+                    logger.error(f"Alpha Vantage API error: {data['Error Message']}")
+                    return None
+
+                if "Note" in data:
+                    logger.warning(f"Alpha Vantage API note: {data['Note']}")
                     return None
+
+                # Update rate limit accounting
+                current_time = time.monotonic()
+                if current_time - self.reset_time >= 60:
+                    self.call_count = 0
+                    self.reset_time = current_time
+                self.last_call_time = current_time
+                self.call_count += 1
+
+                return data
+            else:
+                logger.error(f"Alpha Vantage API request failed: {response.status_code}")
+                return None
                     
         except Exception as e:
             logger.error(f"Failed to make Alpha Vantage request: {e}")
             return None
     
     async def get_quote(self, symbol: str) -> Optional[Dict[str, Any]]:
-        """Get real-time quote for a symbol"""
+        """Get real-time quote for a symbol
+
+        With a 5-calls-per-minute cap the upstream fetch is the system
+        bottleneck, so repeat requests inside a short TTL are answered
+        from cache, and concurrent requests for the same symbol coalesce
+        onto one in-flight fetch instead of each spending a rate slot.
+        """
+        try:
+            now = asyncio.get_running_loop().time()
+            cached = self._quote_cache.get(symbol)
+            if cached is not None and cached[0] > now:
+                return cached[1]
+
+            # Single-flight: piggyback on an already-running fetch
+            inflight = self._inflight.get(symbol)
+            if inflight is not None:
+                return await inflight
+
+            future = asyncio.get_running_loop().create_future()
+            self._inflight[symbol] = future
+            try:
+                result = await self._fetch_quote(symbol)
+            except BaseException as exc:
+                # Resolve waiters with the real failure; cancelling the
+                # shared future would raise CancelledError in callers
+                # that were never themselves cancelled. Retrieving the
+                # exception keeps an unawaited future from logging a
+                # never-retrieved warning.
+                future.set_exception(exc)
+                future.exception()
+                raise
+            else:
+                if result is not None:
+                    self._quote_cache[symbol] = (now + self.quote_cache_ttl, result)
+                future.set_result(result)
+                return result
+            finally:
+                self._inflight.pop(symbol, None)
+
+        except Exception as e:
+            logger.error(f"Failed to get quote for {symbol} from Alpha Vantage: {e}")
+            return None
+
+    async def _fetch_quote(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Fetch a quote from the API, bypassing the cache"""
         try:
             params = {
                 "function": "GLOBAL_QUOTE",
@@ -135,12 +208,20 @@ class AlphaVantageProvider:
             return None
     
     async def get_intraday_data(
-        self, 
-        symbol: str, 
-        interval: str = "5min", 
-        outputsize: str = "compact"
+        self,
+        symbol: str,
+        interval: str = "5min",
+        outputsize: str = "compact",
+        format: str = "columns"
     ) -> Optional[Dict[str, Any]]:
-        """Get intraday time series data"""
+        """Get intraday time series data
+
+        Returns a "columns" dict of NumPy arrays (one contiguous array
+        per OHLCV field plus the timestamp index) so indicator code can
+        consume them without re-extracting columns row by row; pass
+        format="records" to also get the legacy list-of-dicts rows
+        under "data".
+        """
         try:
             params = {
                 "function": "TIME_SERIES_INTRADAY",
@@ -154,28 +235,32 @@ class AlphaVantageProvider:
                 return None
             
             time_series = data[f"Time Series ({interval})"]
-            
-            # Convert to structured format
+
+            # Parse all rows in pandas' C layer: one vectorized
+            # to_datetime with an explicit format and one astype per
+            # column instead of per-row strptime/float calls
+            df = pd.DataFrame.from_dict(time_series, orient="index")
+            df = df.rename(columns=lambda c: c.split(". ")[1])
+            df = df.astype({
+                "open": "float64",
+                "high": "float64",
+                "low": "float64",
+                "close": "float64",
+                "volume": "int64"
+            })
+            df.index = pd.to_datetime(df.index, format="%Y-%m-%d %H:%M:%S")
+            df.sort_index(inplace=True)
+            df.index.name = "timestamp"
+
+            # SoA handoff: one zero-copy ndarray per column
             result = {
                 "symbol": symbol,
                 "interval": interval,
-                "data": []
+                "columns": {c: df[c].to_numpy() for c in df.columns}
             }
-            
-            for timestamp, values in time_series.items():
-                data_point = {
-                    "timestamp": datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S"),
-                    "open": float(values.get("1. open", 0)),
-                    "high": float(values.get("2. high", 0)),
-                    "low": float(values.get("3. low", 0)),
-                    "close": float(values.get("4. close", 0)),
-                    "volume": int(values.get("5. volume", 0))
-                }
-                result["data"].append(data_point)
-            
-            # Sort by timestamp
-            result["data"].sort(key=lambda x: x["timestamp"])
-            
+            result["columns"]["timestamp"] = df.index.to_numpy()
+            if format == "records":
+                result["data"] = df.reset_index().to_dict("records")
             return result
             
         except Exception as e:
@@ -183,11 +268,16 @@ class AlphaVantageProvider:
             return None
     
     async def get_daily_data(
-        self, 
-        symbol: str, 
-        outputsize: str = "compact"
+        self,
+        symbol: str,
+        outputsize: str = "compact",
+        format: str = "columns"
     ) -> Optional[Dict[str, Any]]:
-        """Get daily time series data"""
+        """Get daily time series data
+
+        Returns a "columns" dict of NumPy arrays like get_intraday_data;
+        pass format="records" to also get the legacy rows under "data".
+        """
         try:
             params = {
                 "function": "TIME_SERIES_DAILY",
@@ -200,27 +290,29 @@ class AlphaVantageProvider:
                 return None
             
             time_series = data["Time Series (Daily)"]
-            
-            # Convert to structured format
+
+            # Same vectorized parse as intraday; ISO dates sort
+            # correctly as strings, so the index stays as-is
+            df = pd.DataFrame.from_dict(time_series, orient="index")
+            df = df.rename(columns=lambda c: c.split(". ")[1])
+            df = df.astype({
+                "open": "float64",
+                "high": "float64",
+                "low": "float64",
+                "close": "float64",
+                "volume": "int64"
+            })
+            df.sort_index(inplace=True)
+            df.index.name = "date"
+
+            # SoA handoff: one zero-copy ndarray per column
             result = {
                 "symbol": symbol,
-                "data": []
+                "columns": {c: df[c].to_numpy() for c in df.columns}
             }
-            
-            for date, values in time_series.items():
-                data_point = {
-                    "date": date,
-                    "open": float(values.get("1. open", 0)),
-                    "high": float(values.get("2. high", 0)),
-                    "low": float(values.get("3. low", 0)),
-                    "close": float(values.get("4. close", 0)),
-                    "volume": int(values.get("5. volume", 0))
-                }
-                result["data"].append(data_point)
-            
-            # Sort by date
-            result["data"].sort(key=lambda x: x["date"])
-            
+            result["columns"]["date"] = df.index.to_numpy()
+            if format == "records":
+                result["data"] = df.reset_index().to_dict("records")
             return result
             
         except Exception as e:
@@ -331,9 +423,30 @@ class AlphaVantageProvider:
             logger.error(f"Failed to get earnings calendar from Alpha Vantage: {e}")
             return None
     
+    async def get_symbol_snapshot(self, symbol: str) -> Dict[str, Any]:
+        """Fetch quote, daily history and company overview concurrently
+
+        The three requests are independent, so gathering them overlaps
+        their network latency instead of serializing it; the rate-slot
+        scheduler still spaces the underlying API calls, so the
+        5-per-minute cap is respected.
+        """
+        quote, daily, overview = await asyncio.gather(
+            self.get_quote(symbol),
+            self.get_daily_data(symbol),
+            self.get_company_overview(symbol),
+            return_exceptions=True
+        )
+        return {
+            "symbol": symbol,
+            "quote": None if isinstance(quote, Exception) else quote,
+            "daily": None if isinstance(daily, Exception) else daily,
+            "overview": None if isinstance(overview, Exception) else overview
+        }
+
     def get_rate_limit_info(self) -> Dict[str, Any]:
         """Get current rate limit information"""
-        current_time = datetime.now().timestamp()
+        current_time = time.monotonic()
         time_until_reset = max(0, 60 - (current_time - self.reset_time))
         
         return {
@@ -349,13 +462,19 @@ class AlphaVantageProvider:
         try:
             if not self.api_key:
                 return False
-            
+
             # Try to get a simple quote
             test_symbol = "AAPL"
             quote = await self.get_quote(test_symbol)
-            
+
             return quote is not None
-            
+
         except Exception as e:
             logger.error(f"Alpha Vantage connection test failed: {e}")
             return False
+
+    async def close(self):
+        """Close the HTTP session if this provider owns it"""
+        if self.session and self._owns_session:
+            await self.session.aclose()
+            self.session = None
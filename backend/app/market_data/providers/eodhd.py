@@ -4,42 +4,101 @@ Provides real-time and historical market data via EODHD API
 """
 
 import asyncio
+import json
 import logging
+import time
+from collections import OrderedDict
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timedelta
 import httpx
 
 from app.config import settings
+from app.market_data.cache import response_cache, TTL_REFERENCE
+from app.market_data.resilience import HTTP2_AVAILABLE, CircuitBreaker, SingleFlight, request_with_retry
 
 logger = logging.getLogger(__name__)
 
 class EODHDProvider:
     """EODHD market data provider"""
+
+    _QUOTE_CACHE_MAX = 4096
+    _INTRADAY_PREFIX_MAX = 5000
     
-    def __init__(self):
+    def __init__(self, session: Optional[httpx.AsyncClient] = None):
         self.api_key = settings.EODHD_API_KEY
         self.base_url = "https://eodhd.com/api"
-        self.session = None
-        
+        self.timeout = 30.0
+        self.session = session
+        self._owns_session = session is None
+        self._breaker = CircuitBreaker("eodhd")
+        self._singleflight = SingleFlight()
+        # Hot-path LRU: repeat quote reads within the TTL are served
+        # in-process without any await
+        self._quote_cache: OrderedDict = OrderedDict()
+        # Incremental intraday state: last seen bar epoch and cached
+        # series prefix per (symbol, interval)
+        self._last_bar_ts: Dict[tuple, int] = {}
+        self._intraday_prefix: Dict[tuple, List[Dict[str, Any]]] = {}
+        # Static query params, built once instead of per request
+        self._json_params = {
+            "api_token": self.api_key,
+            "fmt": "json"
+        }
+
     async def _get_session(self) -> httpx.AsyncClient:
-        """Get or create HTTP session"""
+        """Get the shared HTTP session, or lazily create an owned one"""
         if self.session is None:
-            self.session = httpx.AsyncClient(timeout=30.0)
+            self.session = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout, connect=2.0),
+                http2=HTTP2_AVAILABLE,
+                limits=httpx.Limits(
+                    max_connections=100,
+                    max_keepalive_connections=40,
+                    keepalive_expiry=30.0
+                )
+            )
         return self.session
     
-    async def get_quote(self, symbol: str) -> Optional[Dict[str, Any]]:
-        """Get real-time quote for a symbol"""
+    async def get_quote(
+        self,
+        symbol: str,
+        ttl: float = 2.0
+    ) -> Optional[Dict[str, Any]]:
+        """Get real-time quote for a symbol
+
+        Repeat reads within ttl seconds are served from an in-process
+        LRU without touching the network; background scans that
+        tolerate staler data can pass a larger ttl. Concurrent misses
+        for the same symbol share one upstream fetch.
+        """
+        entry = self._quote_cache.get(symbol)
+        if entry is not None and time.monotonic() - entry[0] < ttl:
+            self._quote_cache.move_to_end(symbol)
+            return entry[1]
+
+        quote = await self._singleflight.run(
+            ("quote", symbol),
+            lambda: self._fetch_quote(symbol)
+        )
+        if quote is not None:
+            self._quote_cache[symbol] = (time.monotonic(), quote)
+            self._quote_cache.move_to_end(symbol)
+            if len(self._quote_cache) > self._QUOTE_CACHE_MAX:
+                self._quote_cache.popitem(last=False)
+        return quote
+
+    async def _fetch_quote(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Fetch a quote from the API, bypassing deduplication"""
         try:
             session = await self._get_session()
             url = f"{self.base_url}/real-time/{symbol}"
-            params = {
-                "api_token": self.api_key,
-                "fmt": "json"
-            }
+            params = self._json_params
             
-            response = await session.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
+            response = await request_with_retry(
+                lambda: session.get(url, params=params, timeout=self.timeout),
+                breaker=self._breaker
+            )
+            data = json.loads(response.content)
             
             if data and isinstance(data, dict):
                 return {
@@ -62,6 +121,60 @@ class EODHDProvider:
             logger.error(f"Failed to get EODHD quote for {symbol}: {e}")
             return None
     
+    async def get_quotes(self, symbols: List[str]) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Get real-time quotes for many symbols in one API call
+
+        EODHD serves extra symbols through the s= parameter of the
+        primary-symbol endpoint, so a whole batch costs one round trip
+        instead of one per symbol.
+        """
+        try:
+            if not symbols:
+                return {}
+
+            session = await self._get_session()
+            url = f"{self.base_url}/real-time/{symbols[0]}"
+            params = dict(self._json_params)
+            if len(symbols) > 1:
+                params["s"] = ",".join(symbols[1:])
+
+            response = await request_with_retry(
+                lambda: session.get(url, params=params, timeout=self.timeout),
+                breaker=self._breaker
+            )
+            data = json.loads(response.content)
+
+            # A single-symbol response is a bare dict, not a list
+            if isinstance(data, dict):
+                data = [data]
+
+            timestamp = datetime.now().isoformat()
+            quotes = {}
+            for item in data or []:
+                code = item.get("code", "")
+                if not code:
+                    continue
+                symbol = code.split(".")[0]
+                quotes[symbol] = {
+                    "symbol": symbol,
+                    "price": item.get("close", 0.0),
+                    "change": item.get("change", 0.0),
+                    "change_percent": item.get("change_p", 0.0),
+                    "volume": item.get("volume", 0),
+                    "high": item.get("high", 0.0),
+                    "low": item.get("low", 0.0),
+                    "open": item.get("open", 0.0),
+                    "previous_close": item.get("previousClose", 0.0),
+                    "timestamp": timestamp,
+                    "provider": "eodhd"
+                }
+
+            return quotes or None
+
+        except Exception as e:
+            logger.error(f"Failed to get EODHD quotes for {len(symbols)} symbols: {e}")
+            return None
+
     async def get_historical_data(
         self,
         symbol: str,
@@ -69,24 +182,39 @@ class EODHDProvider:
         from_date: Optional[str] = None,
         to_date: Optional[str] = None
     ) -> Optional[List[Dict[str, Any]]]:
-        """Get historical data for a symbol"""
+        """Get historical data for a symbol
+
+        Concurrent calls for the same range share one upstream fetch.
+        """
+        return await self._singleflight.run(
+            ("eod", symbol, period, from_date, to_date),
+            lambda: self._fetch_historical_data(symbol, period, from_date, to_date)
+        )
+
+    async def _fetch_historical_data(
+        self,
+        symbol: str,
+        period: str = "1d",
+        from_date: Optional[str] = None,
+        to_date: Optional[str] = None
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Fetch historical data from the API, bypassing deduplication"""
         try:
             session = await self._get_session()
             url = f"{self.base_url}/eod/{symbol}"
-            params = {
-                "api_token": self.api_key,
-                "period": period,
-                "fmt": "json"
-            }
+            params = dict(self._json_params)
+            params["period"] = period
             
             if from_date:
                 params["from"] = from_date
             if to_date:
                 params["to"] = to_date
             
-            response = await session.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
+            response = await request_with_retry(
+                lambda: session.get(url, params=params, timeout=self.timeout),
+                breaker=self._breaker
+            )
+            data = json.loads(response.content)
             
             if data and isinstance(data, list):
                 return [
@@ -110,27 +238,71 @@ class EODHDProvider:
             logger.error(f"Failed to get EODHD historical data for {symbol}: {e}")
             return None
     
+    async def _gather_bounded(self, coros, limit: int = 6) -> list:
+        """Run coroutines concurrently with at most limit in flight"""
+        sem = asyncio.Semaphore(limit)
+
+        async def _run(coro):
+            async with sem:
+                return await coro
+
+        return await asyncio.gather(*[_run(coro) for coro in coros])
+
+    async def get_historical_data_many(
+        self,
+        symbols: List[str],
+        period: str = "1d",
+        from_date: Optional[str] = None,
+        to_date: Optional[str] = None,
+        limit: int = 6
+    ) -> Dict[str, Optional[List[Dict[str, Any]]]]:
+        """Get historical data for many symbols concurrently
+
+        There is no batched EOD endpoint, so symbols are fetched in
+        parallel under a semaphore cap rather than one await per symbol;
+        the cap keeps the fan-out inside the connection pool.
+        """
+        results = await self._gather_bounded(
+            [
+                self.get_historical_data(symbol, period, from_date, to_date)
+                for symbol in symbols
+            ],
+            limit=limit
+        )
+        return dict(zip(symbols, results))
+
     async def get_intraday_data(
         self,
         symbol: str,
         interval: str = "1m"
     ) -> Optional[List[Dict[str, Any]]]:
-        """Get intraday data for a symbol"""
+        """Get intraday data for a symbol
+
+        After the first call, only bars newer than the last seen
+        timestamp are requested (from=last+1) and appended to the
+        cached prefix, so response size and parse cost scale with new
+        bars (~1 per minute) instead of the whole day. Callers still
+        receive the full series.
+        """
         try:
+            key = (symbol, interval)
+            last_ts = self._last_bar_ts.get(key)
+
             session = await self._get_session()
             url = f"{self.base_url}/intraday/{symbol}"
-            params = {
-                "api_token": self.api_key,
-                "interval": interval,
-                "fmt": "json"
-            }
-            
-            response = await session.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
-            
-            if data and isinstance(data, list):
-                return [
+            params = dict(self._json_params)
+            params["interval"] = interval
+            if last_ts is not None:
+                params["from"] = last_ts + 1
+
+            response = await request_with_retry(
+                lambda: session.get(url, params=params, timeout=self.timeout),
+                breaker=self._breaker
+            )
+            data = json.loads(response.content)
+
+            if isinstance(data, list):
+                new_rows = [
                     {
                         "symbol": symbol,
                         "timestamp": item.get("datetime", ""),
@@ -143,26 +315,47 @@ class EODHDProvider:
                     }
                     for item in data
                 ]
-            
+                if data:
+                    newest = max(int(item.get("timestamp") or 0) for item in data)
+                    if newest:
+                        self._last_bar_ts[key] = newest
+
+                if last_ts is not None:
+                    series = self._intraday_prefix.get(key, []) + new_rows
+                else:
+                    series = new_rows
+                # Bound the cached prefix for long-running consumers
+                if len(series) > self._INTRADAY_PREFIX_MAX:
+                    series = series[-self._INTRADAY_PREFIX_MAX:]
+                self._intraday_prefix[key] = series
+                return series or None
+
             return None
-            
+
         except Exception as e:
             logger.error(f"Failed to get EODHD intraday data for {symbol}: {e}")
             return None
     
     async def search_symbols(self, query: str) -> Optional[List[Dict[str, Any]]]:
-        """Search for symbols"""
+        """Search for symbols (reference data, cached for a day)"""
+        return await response_cache.cached(
+            ("eodhd", "search", query),
+            TTL_REFERENCE,
+            lambda: self._fetch_search_symbols(query)
+        )
+
+    async def _fetch_search_symbols(self, query: str) -> Optional[List[Dict[str, Any]]]:
+        """Search the API for symbols, bypassing the cache"""
         try:
             session = await self._get_session()
             url = f"{self.base_url}/search/{query}"
-            params = {
-                "api_token": self.api_key,
-                "fmt": "json"
-            }
+            params = self._json_params
             
-            response = await session.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
+            response = await request_with_retry(
+                lambda: session.get(url, params=params, timeout=self.timeout),
+                breaker=self._breaker
+            )
+            data = json.loads(response.content)
             
             if data and isinstance(data, list):
                 return [
@@ -185,7 +378,7 @@ class EODHDProvider:
             return None
     
     async def close(self):
-        """Close the HTTP session"""
-        if self.session:
+        """Close the HTTP session if this provider owns it"""
+        if self.session and self._owns_session:
             await self.session.aclose()
             self.session = None
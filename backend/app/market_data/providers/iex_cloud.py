@@ -3,128 +3,229 @@ IEX Cloud market data provider
 """
 
 import asyncio
+import json
 import logging
+import time
+from collections import OrderedDict
 from typing import Dict, Optional, Any
 import httpx
 from datetime import datetime
 
 from app.config import settings
+from app.market_data.cache import response_cache, TTL_HISTORICAL, TTL_REFERENCE
+from app.market_data.resilience import HTTP2_AVAILABLE, CircuitBreaker, CircuitOpenError, SingleFlight, TokenBucket, request_with_retry
 
 logger = logging.getLogger(__name__)
 
+DAY_SECONDS = 86400
+MONTH_SECONDS = 30 * DAY_SECONDS
+
 class IEXCloudProvider:
     """IEX Cloud API provider for market data"""
+
+    _QUOTE_CACHE_MAX = 4096
     
-    def __init__(self):
+    def __init__(self, session: Optional[httpx.AsyncClient] = None):
         self.api_key = settings.IEX_CLOUD_API_KEY
         self.base_url = "https://cloud.iexapis.com/stable"
         self.sandbox_url = "https://sandbox.iexapis.com/stable"
         self.use_sandbox = False  # Set to True for testing
         self.rate_limit = 500000  # 500K calls per month (free tier)
         self.call_count = 0
-        self.reset_time = datetime.now().timestamp()
-        
+        # Monotonic clock: immune to wall-clock jumps from NTP/DST
+        self.reset_time = time.monotonic()
+        self.last_call_time = 0.0
+        # Monthly budget smoothed to ~0.19 tokens/s with a one-minute burst
+        self._bucket = TokenBucket(
+            capacity=200,
+            refill_per_sec=self.rate_limit / MONTH_SECONDS
+        )
+        self._breaker = CircuitBreaker("iex_cloud")
+        self._singleflight = SingleFlight()
+        # Hot-path LRU: repeat quote reads within the TTL are served
+        # in-process without any await
+        self._quote_cache: OrderedDict = OrderedDict()
+        # Static auth params, built once instead of per request
+        self._token_params = {"token": self.api_key}
+        self.timeout = 10.0
+        self.session = session
+        self._owns_session = session is None
+
         if not self.api_key:
             logger.warning("IEX Cloud API key not configured")
+
+    async def _get_session(self) -> httpx.AsyncClient:
+        """Get the shared HTTP session, or lazily create an owned one"""
+        if self.session is None:
+            self.session = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout, connect=2.0),
+                http2=HTTP2_AVAILABLE,
+                limits=httpx.Limits(
+                    max_connections=100,
+                    max_keepalive_connections=40,
+                    keepalive_expiry=30.0
+                )
+            )
+        return self.session
     
     def _get_base_url(self) -> str:
         """Get the appropriate base URL"""
         return self.sandbox_url if self.use_sandbox else self.base_url
     
-    async def _check_rate_limit(self) -> bool:
-        """Check if we can make an API call"""
-        current_time = datetime.now().timestamp()
-        
-        # Reset counter every month (30 days)
-        if current_time - self.reset_time >= 2592000:  # 30 days in seconds
-            self.call_count = 0
-            self.reset_time = current_time
-        
-        # Check if we've exceeded rate limit
-        if self.call_count >= self.rate_limit:
-            logger.warning("IEX Cloud rate limit exceeded")
-            return False
-        
-        return True
-    
     async def _make_request(self, endpoint: str, params: Optional[Dict[str, str]] = None) -> Optional[Dict[str, Any]]:
-        """Make API request to IEX Cloud"""
+        """Make API request to IEX Cloud
+
+        Concurrent calls for the same endpoint and params share one
+        upstream request.
+        """
+        key = (endpoint, tuple(sorted(params.items())) if params else None)
+        return await self._singleflight.run(
+            key,
+            lambda: self._request(endpoint, params)
+        )
+
+    async def _request(self, endpoint: str, params: Optional[Dict[str, str]] = None) -> Optional[Dict[str, Any]]:
+        """Send one API request, bypassing deduplication"""
         try:
             if not self.api_key:
                 logger.warning("IEX Cloud API key not configured")
                 return None
-            
-            # Check rate limit
-            if not await self._check_rate_limit():
-                return None
-            
-            # Prepare parameters
-            if params is None:
-                params = {}
-            
-            params["token"] = self.api_key
+
+            # The old monthly-window check rejected everything once the
+            # counter was exhausted, so one bursty hour could lock the
+            # provider out for the rest of the month; the bucket waits
+            # for refill instead
+            await self._bucket.acquire()
+
+            # Merge auth in without mutating the caller's dict
+            if params:
+                params = {**self._token_params, **params}
+            else:
+                params = self._token_params
             
             # Build URL
             url = f"{self._get_base_url()}/{endpoint}"
             
-            # Make request
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.get(url, params=params)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    
-                    # Update rate limit tracking
-                    self.call_count += 1
-                    
-                    return data
-                else:
-                    logger.error(f"IEX Cloud API request failed: {response.status_code} - {response.text}")
-                    return None
-                    
+            # Make request on the pooled session (keep-alive, no per-call
+            # TCP/TLS handshake); transient 429/5xx and timeouts are
+            # retried with jittered backoff, each 429 halving burst
+            # capacity, and repeated failures open the circuit
+            client = await self._get_session()
+            response = await request_with_retry(
+                lambda: client.get(url, params=params, timeout=self.timeout),
+                breaker=self._breaker,
+                on_throttle=self._bucket.shrink
+            )
+
+            data = json.loads(response.content)
+
+            # Update rate limit tracking; AIMD: successes slowly
+            # restore burst capacity
+            self.call_count += 1
+            self.last_call_time = time.monotonic()
+            self._bucket.grow()
+
+            return data
+
+        except CircuitOpenError as e:
+            logger.warning(f"IEX Cloud request skipped: {e}")
+            return None
         except Exception as e:
             logger.error(f"Failed to make IEX Cloud request: {e}")
             return None
     
-    async def get_quote(self, symbol: str) -> Optional[Dict[str, Any]]:
-        """Get real-time quote for a symbol"""
+    def _parse_quote(self, data: Dict[str, Any], symbol: str) -> Dict[str, Any]:
+        """Parse a raw IEX quote payload into the common quote shape"""
+        result = {
+            "symbol": data.get("symbol", symbol),
+            "price": float(data.get("latestPrice", 0)),
+            "change": float(data.get("change", 0)),
+            "change_percent": float(data.get("changePercent", 0)) * 100,  # Convert to percentage
+            "volume": int(data.get("latestVolume", 0)),
+            "high": float(data.get("high", 0)),
+            "low": float(data.get("low", 0)),
+            "open": float(data.get("open", 0)),
+            "previous_close": float(data.get("previousClose", 0)),
+            "exchange": data.get("primaryExchange", "NYSE"),
+            "timestamp": datetime.utcnow()
+        }
+
+        # Calculate bid/ask spread (estimate)
+        if result["price"] > 0:
+            result["bid"] = result["price"] * 0.999  # Estimate bid
+            result["ask"] = result["price"] * 1.001  # Estimate ask
+            result["spread"] = result["ask"] - result["bid"]
+        else:
+            result["bid"] = 0
+            result["ask"] = 0
+            result["spread"] = 0
+
+        return result
+
+    async def get_quote(
+        self,
+        symbol: str,
+        ttl: float = 2.0
+    ) -> Optional[Dict[str, Any]]:
+        """Get real-time quote for a symbol
+
+        Repeat reads within ttl seconds are served from an in-process
+        LRU without touching the network; background scans that
+        tolerate staler data can pass a larger ttl.
+        """
         try:
+            entry = self._quote_cache.get(symbol)
+            if entry is not None and time.monotonic() - entry[0] < ttl:
+                self._quote_cache.move_to_end(symbol)
+                return entry[1]
+
             endpoint = f"stock/{symbol}/quote"
-            
+
             data = await self._make_request(endpoint)
             if not data:
                 return None
-            
-            # Parse quote data
-            result = {
-                "symbol": data.get("symbol", symbol),
-                "price": float(data.get("latestPrice", 0)),
-                "change": float(data.get("change", 0)),
-                "change_percent": float(data.get("changePercent", 0)) * 100,  # Convert to percentage
-                "volume": int(data.get("latestVolume", 0)),
-                "high": float(data.get("high", 0)),
-                "low": float(data.get("low", 0)),
-                "open": float(data.get("open", 0)),
-                "previous_close": float(data.get("previousClose", 0)),
-                "exchange": data.get("primaryExchange", "NYSE"),
-                "timestamp": datetime.utcnow()
-            }
-            
-            # Calculate bid/ask spread (estimate)
-            if result["price"] > 0:
-                result["bid"] = result["price"] * 0.999  # Estimate bid
-                result["ask"] = result["price"] * 1.001  # Estimate ask
-                result["spread"] = result["ask"] - result["bid"]
-            else:
-                result["bid"] = 0
-                result["ask"] = 0
-                result["spread"] = 0
-            
-            return result
-            
+
+            quote = self._parse_quote(data, symbol)
+            self._quote_cache[symbol] = (time.monotonic(), quote)
+            self._quote_cache.move_to_end(symbol)
+            if len(self._quote_cache) > self._QUOTE_CACHE_MAX:
+                self._quote_cache.popitem(last=False)
+            return quote
+
         except Exception as e:
             logger.error(f"Failed to get quote for {symbol} from IEX Cloud: {e}")
             return None
+
+    async def get_quotes(self, symbols: list) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Get quotes for many symbols via the batch endpoint
+
+        IEX caps batch requests at 100 symbols, so larger lists are
+        chunked; each chunk is still one API call instead of one per
+        symbol.
+        """
+        try:
+            if not symbols:
+                return {}
+
+            quotes = {}
+            for i in range(0, len(symbols), 100):
+                chunk = symbols[i:i + 100]
+                data = await self._make_request(
+                    "stock/market/batch",
+                    {"symbols": ",".join(chunk), "types": "quote"}
+                )
+                if not data:
+                    continue
+                for symbol, payload in data.items():
+                    quote = payload.get("quote")
+                    if quote:
+                        quotes[symbol] = self._parse_quote(quote, symbol)
+
+            return quotes or None
+
+        except Exception as e:
+            logger.error(f"Failed to get quotes for {len(symbols)} symbols from IEX Cloud: {e}")
+            return None
     
     async def get_intraday_data(
         self, 
@@ -210,8 +311,44 @@ class IEXCloudProvider:
             logger.error(f"Failed to get daily data for {symbol} from IEX Cloud: {e}")
             return None
     
+    async def _gather_bounded(self, coros, limit: int = 6) -> list:
+        """Run coroutines concurrently with at most limit in flight"""
+        sem = asyncio.Semaphore(limit)
+
+        async def _run(coro):
+            async with sem:
+                return await coro
+
+        return await asyncio.gather(*[_run(coro) for coro in coros])
+
+    async def get_daily_data_many(
+        self,
+        symbols: list,
+        range: str = "1m",
+        limit: int = 6
+    ) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Get daily time series for many symbols concurrently
+
+        The chart endpoint is per-symbol, so symbols are fetched in
+        parallel under a semaphore cap rather than one await per symbol;
+        the cap keeps the fan-out inside the connection pool.
+        """
+        results = await self._gather_bounded(
+            [self.get_daily_data(symbol, range) for symbol in symbols],
+            limit=limit
+        )
+        return dict(zip(symbols, results))
+
     async def get_company_info(self, symbol: str) -> Optional[Dict[str, Any]]:
-        """Get company information"""
+        """Get company information (cached for a day)"""
+        return await response_cache.cached(
+            ("iex", "company_info", symbol),
+            TTL_REFERENCE,
+            lambda: self._fetch_company_info(symbol)
+        )
+
+    async def _fetch_company_info(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Fetch company information from the API, bypassing the cache"""
         try:
             endpoint = f"stock/{symbol}/company"
             
@@ -240,7 +377,15 @@ class IEXCloudProvider:
             return None
     
     async def get_key_stats(self, symbol: str) -> Optional[Dict[str, Any]]:
-        """Get key statistics for a symbol"""
+        """Get key statistics for a symbol (cached for an hour)"""
+        return await response_cache.cached(
+            ("iex", "key_stats", symbol),
+            TTL_HISTORICAL,
+            lambda: self._fetch_key_stats(symbol)
+        )
+
+    async def _fetch_key_stats(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Fetch key statistics from the API, bypassing the cache"""
         try:
             endpoint = f"stock/{symbol}/stats"
             
@@ -318,7 +463,15 @@ class IEXCloudProvider:
             return None
     
     async def get_symbols(self) -> Optional[Dict[str, Any]]:
-        """Get list of all symbols"""
+        """Get list of all symbols (bulk reference data, cached for a day)"""
+        return await response_cache.cached(
+            ("iex", "symbols"),
+            TTL_REFERENCE,
+            self._fetch_symbols
+        )
+
+    async def _fetch_symbols(self) -> Optional[Dict[str, Any]]:
+        """Fetch the symbol list from the API, bypassing the cache"""
         try:
             endpoint = "ref-data/symbols"
             
@@ -337,15 +490,19 @@ class IEXCloudProvider:
     
     def get_rate_limit_info(self) -> Dict[str, Any]:
         """Get current rate limit information"""
-        current_time = datetime.now().timestamp()
-        time_until_reset = max(0, 2592000 - (current_time - self.reset_time))
+        current_time = time.monotonic()
+        time_until_reset = max(0, MONTH_SECONDS - (current_time - self.reset_time))
         
         return {
             "calls_made": self.call_count,
             "calls_remaining": max(0, self.rate_limit - self.call_count),
             "rate_limit": self.rate_limit,
-            "time_until_reset_days": round(time_until_reset / 86400, 1),
-            "last_call": self.last_call_time
+            "time_until_reset_days": round(time_until_reset / DAY_SECONDS, 1),
+            "last_call": self.last_call_time,
+            "time_since_last_call": (
+                round(current_time - self.last_call_time, 2)
+                if self.last_call_time else None
+            )
         }
     
     async def test_connection(self) -> bool:
@@ -364,6 +521,12 @@ class IEXCloudProvider:
             logger.error(f"IEX Cloud connection test failed: {e}")
             return False
     
+    async def close(self):
+        """Close the HTTP session if this provider owns it"""
+        if self.session and self._owns_session:
+            await self.session.aclose()
+            self.session = None
+
     def enable_sandbox(self):
         """Enable sandbox mode for testing"""
         self.use_sandbox = True
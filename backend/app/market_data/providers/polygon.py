@@ -4,41 +4,127 @@ Provides real-time and historical market data via Polygon.io API
 """
 
 import asyncio
+import json
 import logging
-from typing import Dict, List, Optional, Any
+import time
+from collections import OrderedDict
+from typing import AsyncIterator, Callable, Dict, List, Optional, Any
 from datetime import datetime, timedelta
 import httpx
+import numpy as np
+import websockets
 
 from app.config import settings
+from app.market_data.cache import response_cache, TTL_REFERENCE
+from app.market_data.models import Bar
+from app.market_data.resilience import HTTP2_AVAILABLE, CircuitBreaker, SingleFlight, request_with_retry
 
 logger = logging.getLogger(__name__)
 
 class PolygonProvider:
     """Polygon.io market data provider"""
+
+    _QUOTE_CACHE_MAX = 4096
+    _INTRADAY_PREFIX_MAX = 5000
     
-    def __init__(self):
+    def __init__(self, session: Optional[httpx.AsyncClient] = None):
         self.api_key = settings.POLYGON_API_KEY
         self.base_url = "https://api.polygon.io"
-        self.session = None
-        
+        self.ws_url = "wss://socket.polygon.io/stocks"
+        # Last tick per symbol, kept fresh by stream_quotes
+        self.latest_quotes: Dict[str, Dict[str, Any]] = {}
+        self.timeout = 30.0
+        self.session = session
+        self._owns_session = session is None
+        self._breaker = CircuitBreaker("polygon")
+        self._singleflight = SingleFlight()
+        # Hot-path LRU: repeat quote reads within the TTL are served
+        # in-process without any await
+        self._quote_cache: OrderedDict = OrderedDict()
+        # Incremental intraday state: last seen bar epoch (ms) and
+        # cached series prefix per (symbol, date, timespan)
+        self._last_bar_ts: Dict[tuple, int] = {}
+        self._intraday_prefix: Dict[tuple, List[Dict[str, Any]]] = {}
+        # Static query params, built once instead of per request
+        self._auth_params = {"apiKey": self.api_key}
+        self._aggs_params = {
+            "apiKey": self.api_key,
+            "adjusted": "true",
+            "sort": "asc"
+        }
+
     async def _get_session(self) -> httpx.AsyncClient:
-        """Get or create HTTP session"""
+        """Get the shared HTTP session, or lazily create an owned one"""
         if self.session is None:
-            self.session = httpx.AsyncClient(timeout=30.0)
+            self.session = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout, connect=2.0),
+                http2=HTTP2_AVAILABLE,
+                limits=httpx.Limits(
+                    max_connections=100,
+                    max_keepalive_connections=40,
+                    keepalive_expiry=30.0
+                )
+            )
         return self.session
     
-    async def get_quote(self, symbol: str) -> Optional[Dict[str, Any]]:
-        """Get real-time quote for a symbol"""
+    @staticmethod
+    def _iso_timestamps(results: List[Dict[str, Any]], unit: str = "ms") -> List[str]:
+        """Convert the epoch t field of every row to an ISO string
+
+        One vectorized datetime64 pass instead of a datetime.fromtimestamp
+        round trip per row; aggregate bars carry millisecond epochs,
+        trades nanosecond ones. Timestamps are rendered in UTC.
+        """
+        ts = np.fromiter(
+            (item["t"] for item in results),
+            dtype=np.int64,
+            count=len(results)
+        )
+        out_unit = "us" if unit == "ns" else "s"
+        return np.datetime_as_string(
+            ts.astype(f"datetime64[{unit}]"), unit=out_unit
+        ).tolist()
+
+    async def get_quote(
+        self,
+        symbol: str,
+        ttl: float = 2.0
+    ) -> Optional[Dict[str, Any]]:
+        """Get real-time quote for a symbol
+
+        Repeat reads within ttl seconds are served from an in-process
+        LRU without touching the network; background scans that
+        tolerate staler data can pass a larger ttl. Concurrent misses
+        for the same symbol share one upstream fetch.
+        """
+        entry = self._quote_cache.get(symbol)
+        if entry is not None and time.monotonic() - entry[0] < ttl:
+            self._quote_cache.move_to_end(symbol)
+            return entry[1]
+
+        quote = await self._singleflight.run(
+            ("quote", symbol),
+            lambda: self._fetch_quote(symbol)
+        )
+        if quote is not None:
+            self._quote_cache[symbol] = (time.monotonic(), quote)
+            self._quote_cache.move_to_end(symbol)
+            if len(self._quote_cache) > self._QUOTE_CACHE_MAX:
+                self._quote_cache.popitem(last=False)
+        return quote
+
+    async def _fetch_quote(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Fetch a quote from the API, bypassing deduplication"""
         try:
             session = await self._get_session()
             url = f"{self.base_url}/v2/snapshot/locale/us/markets/stocks/tickers/{symbol}/quote"
-            params = {
-                "apiKey": self.api_key
-            }
+            params = self._auth_params
             
-            response = await session.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
+            response = await request_with_retry(
+                lambda: session.get(url, params=params, timeout=self.timeout),
+                breaker=self._breaker
+            )
+            data = json.loads(response.content)
             
             if data and "results" in data and data["results"]:
                 quote = data["results"]
@@ -62,6 +148,125 @@ class PolygonProvider:
             logger.error(f"Failed to get Polygon quote for {symbol}: {e}")
             return None
     
+    async def get_quotes(self, symbols: List[str]) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Get snapshot quotes for many symbols in one API call
+
+        The multi-ticker snapshot endpoint returns the whole batch in a
+        single round trip instead of one request per symbol.
+        """
+        try:
+            if not symbols:
+                return {}
+
+            session = await self._get_session()
+            url = f"{self.base_url}/v2/snapshot/locale/us/markets/stocks/tickers"
+            params = dict(self._auth_params)
+            params["tickers"] = ",".join(symbols)
+
+            response = await request_with_retry(
+                lambda: session.get(url, params=params, timeout=self.timeout),
+                breaker=self._breaker
+            )
+            data = json.loads(response.content)
+
+            if data and "tickers" in data and data["tickers"]:
+                timestamp = datetime.now().isoformat()
+                quotes = {}
+                for item in data["tickers"]:
+                    symbol = item.get("ticker", "")
+                    if not symbol:
+                        continue
+                    day = item.get("day") or {}
+                    last_trade = item.get("lastTrade") or {}
+                    prev_day = item.get("prevDay") or {}
+                    quotes[symbol] = {
+                        "symbol": symbol,
+                        "price": last_trade.get("p", day.get("c", 0.0)),
+                        "change": item.get("todaysChange", 0.0),
+                        "change_percent": item.get("todaysChangePerc", 0.0),
+                        "volume": day.get("v", 0),
+                        "high": day.get("h", 0.0),
+                        "low": day.get("l", 0.0),
+                        "open": day.get("o", 0.0),
+                        "previous_close": prev_day.get("c", 0.0),
+                        "timestamp": timestamp,
+                        "provider": "polygon"
+                    }
+                return quotes or None
+
+            return None
+
+        except Exception as e:
+            logger.error(f"Failed to get Polygon quotes for {len(symbols)} symbols: {e}")
+            return None
+
+    async def stream_quotes(
+        self,
+        symbols: List[str],
+        on_tick: Optional[Callable[[Dict[str, Any]], Any]] = None,
+        rest_poll_interval: float = 5.0
+    ) -> None:
+        """Stream real-time quotes over the Polygon WebSocket feed
+
+        Authenticates, subscribes to trade events for the symbols, and
+        keeps latest_quotes updated from pushed ticks so consumers read
+        the newest price without a REST round trip. Each parsed tick is
+        also handed to on_tick when given (sync or async). If the
+        socket cannot be established or drops, falls back to polling
+        get_quotes every rest_poll_interval seconds. Runs until
+        cancelled.
+        """
+        try:
+            async with websockets.connect(self.ws_url) as ws:
+                await ws.send(json.dumps({
+                    "action": "auth",
+                    "params": self.api_key
+                }))
+                await ws.send(json.dumps({
+                    "action": "subscribe",
+                    "params": ",".join(f"T.{symbol}" for symbol in symbols)
+                }))
+
+                async for raw in ws:
+                    events = json.loads(raw)
+                    if isinstance(events, dict):
+                        events = [events]
+                    for event in events:
+                        if event.get("ev") != "T":
+                            continue
+                        symbol = event.get("sym", "")
+                        if not symbol:
+                            continue
+                        tick = {
+                            "symbol": symbol,
+                            "price": event.get("p", 0.0),
+                            "size": event.get("s", 0),
+                            "timestamp": event.get("t", 0),
+                            "provider": "polygon"
+                        }
+                        self.latest_quotes[symbol] = tick
+                        if on_tick is not None:
+                            result = on_tick(tick)
+                            if asyncio.iscoroutine(result):
+                                await result
+
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(
+                f"Polygon WebSocket stream failed, falling back to "
+                f"REST polling: {e}"
+            )
+            while True:
+                quotes = await self.get_quotes(symbols)
+                for symbol, quote in (quotes or {}).items():
+                    self.latest_quotes[symbol] = quote
+                    if on_tick is not None:
+                        result = on_tick(quote)
+                        if asyncio.iscoroutine(result):
+                            await result
+                await asyncio.sleep(rest_poll_interval)
+
     async def get_historical_data(
         self,
         symbol: str,
@@ -69,25 +274,41 @@ class PolygonProvider:
         to_date: str,
         timespan: str = "day"
     ) -> Optional[List[Dict[str, Any]]]:
-        """Get historical data for a symbol"""
+        """Get historical data for a symbol
+
+        Concurrent calls for the same range share one upstream fetch.
+        """
+        return await self._singleflight.run(
+            ("aggs", symbol, from_date, to_date, timespan),
+            lambda: self._fetch_historical_data(symbol, from_date, to_date, timespan)
+        )
+
+    async def _fetch_historical_data(
+        self,
+        symbol: str,
+        from_date: str,
+        to_date: str,
+        timespan: str = "day"
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Fetch historical data from the API, bypassing deduplication"""
         try:
             session = await self._get_session()
             url = f"{self.base_url}/v2/aggs/ticker/{symbol}/range/1/{timespan}/{from_date}/{to_date}"
-            params = {
-                "apiKey": self.api_key,
-                "adjusted": "true",
-                "sort": "asc"
-            }
+            params = self._aggs_params
             
-            response = await session.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
+            response = await request_with_retry(
+                lambda: session.get(url, params=params, timeout=self.timeout),
+                breaker=self._breaker
+            )
+            data = json.loads(response.content)
             
             if data and "results" in data and data["results"]:
+                results = data["results"]
+                dates = self._iso_timestamps(results)
                 return [
                     {
                         "symbol": symbol,
-                        "date": datetime.fromtimestamp(item["t"] / 1000).isoformat(),
+                        "date": dates[idx],
                         "open": item.get("o", 0.0),
                         "high": item.get("h", 0.0),
                         "low": item.get("l", 0.0),
@@ -97,7 +318,7 @@ class PolygonProvider:
                         "transactions": item.get("n", 0),
                         "provider": "polygon"
                     }
-                    for item in data["results"]
+                    for idx, item in enumerate(results)
                 ]
             
             return None
@@ -106,31 +327,175 @@ class PolygonProvider:
             logger.error(f"Failed to get Polygon historical data for {symbol}: {e}")
             return None
     
+    async def get_historical_bars(
+        self,
+        symbol: str,
+        from_date: str,
+        to_date: str,
+        timespan: str = "day"
+    ) -> Optional[List[Bar]]:
+        """Get historical data as slot-based Bar rows
+
+        Same endpoint as get_historical_data, but each row is a Bar
+        instead of a dict, which is several times smaller per row —
+        worth it for multi-year ranges held in memory. Bar.to_dict()
+        recovers the dict shape where callers need it.
+        """
+        try:
+            session = await self._get_session()
+            url = f"{self.base_url}/v2/aggs/ticker/{symbol}/range/1/{timespan}/{from_date}/{to_date}"
+            params = self._aggs_params
+
+            response = await request_with_retry(
+                lambda: session.get(url, params=params, timeout=self.timeout),
+                breaker=self._breaker
+            )
+            data = json.loads(response.content)
+
+            if data and "results" in data and data["results"]:
+                results = data["results"]
+                dates = self._iso_timestamps(results)
+                return [
+                    Bar(
+                        symbol=symbol,
+                        date=dates[idx],
+                        open=item.get("o", 0.0),
+                        high=item.get("h", 0.0),
+                        low=item.get("l", 0.0),
+                        close=item.get("c", 0.0),
+                        volume=item.get("v", 0),
+                        vwap=item.get("vw", 0.0),
+                        provider="polygon"
+                    )
+                    for idx, item in enumerate(results)
+                ]
+
+            return None
+
+        except Exception as e:
+            logger.error(f"Failed to get Polygon historical bars for {symbol}: {e}")
+            return None
+
+    async def iter_historical_bars(
+        self,
+        symbol: str,
+        from_date: str,
+        to_date: str,
+        timespan: str = "day"
+    ) -> AsyncIterator[Bar]:
+        """Yield historical bars one at a time
+
+        Streams the response body off the socket and hands rows to the
+        consumer lazily, so callers that write to disk or aggregate
+        never hold the transformed row list in memory. The JSON itself
+        is still decoded in one pass — an incremental parser is not
+        among this project's dependencies — so peak memory is the raw
+        payload plus one Bar, not payload plus the full row list.
+        """
+        try:
+            session = await self._get_session()
+            url = f"{self.base_url}/v2/aggs/ticker/{symbol}/range/1/{timespan}/{from_date}/{to_date}"
+
+            async with session.stream(
+                "GET", url, params=self._aggs_params, timeout=self.timeout
+            ) as response:
+                response.raise_for_status()
+                body = b"".join([chunk async for chunk in response.aiter_bytes()])
+
+            data = json.loads(body)
+            del body
+        except Exception as e:
+            logger.error(f"Failed to stream Polygon historical bars for {symbol}: {e}")
+            return
+
+        if not data or not data.get("results"):
+            return
+
+        results = data["results"]
+        dates = self._iso_timestamps(results)
+        for idx, item in enumerate(results):
+            yield Bar(
+                symbol=symbol,
+                date=dates[idx],
+                open=item.get("o", 0.0),
+                high=item.get("h", 0.0),
+                low=item.get("l", 0.0),
+                close=item.get("c", 0.0),
+                volume=item.get("v", 0),
+                vwap=item.get("vw", 0.0),
+                provider="polygon"
+            )
+
+    async def _gather_bounded(self, coros, limit: int = 6) -> list:
+        """Run coroutines concurrently with at most limit in flight"""
+        sem = asyncio.Semaphore(limit)
+
+        async def _run(coro):
+            async with sem:
+                return await coro
+
+        return await asyncio.gather(*[_run(coro) for coro in coros])
+
+    async def get_historical_data_many(
+        self,
+        symbols: List[str],
+        from_date: str,
+        to_date: str,
+        timespan: str = "day",
+        limit: int = 6
+    ) -> Dict[str, Optional[List[Dict[str, Any]]]]:
+        """Get historical data for many symbols concurrently
+
+        The aggregates endpoint is per-ticker, so symbols are fetched in
+        parallel under a semaphore cap rather than one await per symbol;
+        the cap keeps the fan-out inside the connection pool.
+        """
+        results = await self._gather_bounded(
+            [
+                self.get_historical_data(symbol, from_date, to_date, timespan)
+                for symbol in symbols
+            ],
+            limit=limit
+        )
+        return dict(zip(symbols, results))
+
     async def get_intraday_data(
         self,
         symbol: str,
         date: str,
         timespan: str = "minute"
     ) -> Optional[List[Dict[str, Any]]]:
-        """Get intraday data for a symbol"""
+        """Get intraday data for a symbol
+
+        After the first call for a (symbol, date), the range start is
+        advanced past the last seen bar (the aggs path accepts a
+        millisecond epoch) and only the new bars are fetched and
+        appended to the cached prefix, so response size scales with new
+        bars instead of the whole day. Callers still receive the full
+        series.
+        """
         try:
+            key = (symbol, date, timespan)
+            last_ts = self._last_bar_ts.get(key)
+            range_from = str(last_ts + 60000) if last_ts is not None else date
+
             session = await self._get_session()
-            url = f"{self.base_url}/v2/aggs/ticker/{symbol}/range/1/{timespan}/{date}/{date}"
-            params = {
-                "apiKey": self.api_key,
-                "adjusted": "true",
-                "sort": "asc"
-            }
+            url = f"{self.base_url}/v2/aggs/ticker/{symbol}/range/1/{timespan}/{range_from}/{date}"
+            params = self._aggs_params
             
-            response = await session.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
+            response = await request_with_retry(
+                lambda: session.get(url, params=params, timeout=self.timeout),
+                breaker=self._breaker
+            )
+            data = json.loads(response.content)
             
-            if data and "results" in data and data["results"]:
-                return [
+            if data and "results" in data:
+                results = data["results"] or []
+                timestamps = self._iso_timestamps(results)
+                new_rows = [
                     {
                         "symbol": symbol,
-                        "timestamp": datetime.fromtimestamp(item["t"] / 1000).isoformat(),
+                        "timestamp": timestamps[idx],
                         "open": item.get("o", 0.0),
                         "high": item.get("h", 0.0),
                         "low": item.get("l", 0.0),
@@ -140,8 +505,20 @@ class PolygonProvider:
                         "transactions": item.get("n", 0),
                         "provider": "polygon"
                     }
-                    for item in data["results"]
+                    for idx, item in enumerate(results)
                 ]
+                if results:
+                    self._last_bar_ts[key] = max(item["t"] for item in results)
+
+                if last_ts is not None:
+                    series = self._intraday_prefix.get(key, []) + new_rows
+                else:
+                    series = new_rows
+                # Bound the cached prefix for long-running consumers
+                if len(series) > self._INTRADAY_PREFIX_MAX:
+                    series = series[-self._INTRADAY_PREFIX_MAX:]
+                self._intraday_prefix[key] = series
+                return series or None
             
             return None
             
@@ -159,27 +536,29 @@ class PolygonProvider:
         try:
             session = await self._get_session()
             url = f"{self.base_url}/v3/trades/{symbol}/{date}"
-            params = {
-                "apiKey": self.api_key,
-                "limit": limit
-            }
+            params = dict(self._auth_params)
+            params["limit"] = limit
             
-            response = await session.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
+            response = await request_with_retry(
+                lambda: session.get(url, params=params, timeout=self.timeout),
+                breaker=self._breaker
+            )
+            data = json.loads(response.content)
             
             if data and "results" in data and data["results"]:
+                results = data["results"]
+                timestamps = self._iso_timestamps(results, unit="ns")
                 return [
                     {
                         "symbol": symbol,
-                        "timestamp": datetime.fromtimestamp(item["t"] / 1000000000).isoformat(),
+                        "timestamp": timestamps[idx],
                         "price": item.get("p", 0.0),
                         "size": item.get("s", 0),
                         "exchange": item.get("x", ""),
                         "conditions": item.get("c", []),
                         "provider": "polygon"
                     }
-                    for item in data["results"]
+                    for idx, item in enumerate(results)
                 ]
             
             return None
@@ -189,20 +568,26 @@ class PolygonProvider:
             return None
     
     async def search_tickers(self, query: str) -> Optional[List[Dict[str, Any]]]:
-        """Search for tickers"""
+        """Search for tickers (reference data, cached for a day)"""
+        return await response_cache.cached(
+            ("polygon", "search", query),
+            TTL_REFERENCE,
+            lambda: self._fetch_search_tickers(query)
+        )
+
+    async def _fetch_search_tickers(self, query: str) -> Optional[List[Dict[str, Any]]]:
+        """Search the API for tickers, bypassing the cache"""
         try:
             session = await self._get_session()
             url = f"{self.base_url}/v3/reference/tickers"
-            params = {
-                "apiKey": self.api_key,
-                "search": query,
-                "active": "true",
-                "limit": 50
-            }
+            params = dict(self._auth_params)
+            params.update(search=query, active="true", limit=50)
             
-            response = await session.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
+            response = await request_with_retry(
+                lambda: session.get(url, params=params, timeout=self.timeout),
+                breaker=self._breaker
+            )
+            data = json.loads(response.content)
             
             if data and "results" in data and data["results"]:
                 return [
@@ -227,7 +612,7 @@ class PolygonProvider:
             return None
     
     async def close(self):
-        """Close the HTTP session"""
-        if self.session:
+        """Close the HTTP session if this provider owns it"""
+        if self.session and self._owns_session:
             await self.session.aclose()
             self.session = None
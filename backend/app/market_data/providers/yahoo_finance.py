@@ -3,49 +3,278 @@ Yahoo Finance market data provider (unofficial API)
 """
 
 import asyncio
+import hashlib
 import logging
-from typing import Dict, Optional, Any
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Any, Tuple
 import httpx
+import numpy as np
 from datetime import datetime, timedelta
 import json
 
+from app.market_data.cache import response_cache, TTL_INTRADAY, TTL_QUOTE, TTL_REFERENCE
+from app.market_data.resilience import HTTP2_AVAILABLE, CircuitBreaker, CircuitOpenError, SingleFlight, TokenBucket, request_with_retry
+
 logger = logging.getLogger(__name__)
 
+def _json_fallback(obj):
+    """Serialize lazy views via to_dict; stringify anything else"""
+    to_dict = getattr(obj, "to_dict", None)
+    if to_dict is not None:
+        return to_dict()
+    return str(obj)
+
+# Human-readable names for index symbols, built once at import
+_INDEX_NAMES = {
+    "^GSPC": "S&P 500",
+    "^DJI": "Dow Jones Industrial Average",
+    "^IXIC": "NASDAQ Composite",
+    "^RUT": "Russell 2000",
+    "^VIX": "CBOE Volatility Index"
+}
+
+def _assemble_ohlcv(result_data):
+    """Assemble chart OHLCV columns in one fused pass
+
+    All five fields land in a single (5, n) float64 matrix (None
+    becomes NaN on conversion), so the NaN scan, the row filter on
+    missing closes, and the zero-fill of remaining gaps each run once
+    over one contiguous buffer instead of once per column. Module-level
+    so the kernel is shared by the intraday and daily parsers. Returns
+    (ts, open, high, low, close, volume) aligned arrays.
+    """
+    timestamp = result_data.get("timestamp", [])
+    quote = result_data.get("indicators", {}).get("quote", [{}])[0]
+    n = len(timestamp)
+
+    cols = np.full((5, n), np.nan)
+    for row, name in enumerate(("open", "high", "low", "close", "volume")):
+        values = quote.get(name, [])
+        m = min(n, len(values))
+        cols[row, :m] = np.array(values[:m], dtype=np.float64)
+
+    ts = np.asarray(timestamp, dtype=np.int64)
+    mask = ~np.isnan(cols[3])
+    cols = cols[:, mask]
+    np.nan_to_num(cols, copy=False)
+    return (
+        ts[mask], cols[0], cols[1], cols[2], cols[3],
+        cols[4].astype(np.int64)
+    )
+
+class _QuoteSummaryView:
+    """Lazy flat view over one quoteSummary result
+
+    Consumers of company info and key stats typically read one or two
+    of the 15+ flattened fields, so fields resolve from the decoded
+    JSON on access instead of being materialized up front. Iteration,
+    items(), and to_dict() walk the full schema for dict-style
+    consumers; to_dict() is also what persists when an entry is
+    written to the disk cache.
+    """
+
+    __slots__ = ("_raw", "_fields", "_symbol")
+
+    def __init__(self, raw, fields, symbol):
+        self._raw = raw
+        self._fields = fields
+        self._symbol = symbol
+
+    def __getitem__(self, key):
+        if key == "symbol":
+            return self._symbol
+        module, src_key, default = self._fields[key]
+        return (self._raw.get(module) or {}).get(src_key, default)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __iter__(self):
+        yield "symbol"
+        yield from self._fields
+
+    def __len__(self):
+        return len(self._fields) + 1
+
+    def __contains__(self, key):
+        return key == "symbol" or key in self._fields
+
+    def keys(self):
+        return list(self)
+
+    def items(self):
+        return [(key, self[key]) for key in self]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {key: self[key] for key in self}
+
 class YahooFinanceProvider:
     """Yahoo Finance API provider for market data (unofficial)"""
-    
-    def __init__(self):
+
+    _QUOTE_CACHE_MAX = 4096
+    # Daily bars change once a session; worth holding longer than
+    # intraday but far shorter than reference data
+    _TTL_DAILY = 300
+    # Disk TTLs: company profiles change on weekly-or-longer
+    # timescales; daily bars and key stats at most once a session
+    _DISK_TTL_COMPANY = 7 * 86400
+    _DISK_TTL_DAILY = 86400
+    # v7/finance/quote accepts roughly this many symbols per call
+    _MAX_BATCH = 200
+    # Endpoint templates, built once; %-interpolation at the call site
+    # is cheaper than rebuilding the literal and calling .format each
+    # request
+    _CHART_EP = "v8/finance/chart/%s"
+    _QS_EP = "v10/finance/quoteSummary/%s"
+    _QUOTE_EP = "v7/finance/quote"
+    _SEARCH_EP = "v1/finance/search"
+    # quoteSummary flattening schemas, declared once:
+    # output key -> (module, source key, default)
+    _COMPANY_FIELDS = {
+        "company_name": ("assetProfile", "longName", ""),
+        "exchange": ("summaryProfile", "exchange", ""),
+        "industry": ("assetProfile", "industry", ""),
+        "website": ("assetProfile", "website", ""),
+        "description": ("assetProfile", "longBusinessSummary", ""),
+        "sector": ("assetProfile", "sector", ""),
+        "employees": ("assetProfile", "fullTimeEmployees", 0),
+        "country": ("assetProfile", "country", ""),
+        "city": ("assetProfile", "city", ""),
+        "state": ("assetProfile", "state", ""),
+        "zip": ("assetProfile", "zip", ""),
+        "phone": ("assetProfile", "phone", ""),
+        "market_cap": ("summaryDetail", "marketCap", 0),
+        "enterprise_value": ("summaryDetail", "enterpriseValue", 0)
+    }
+    _STATS_FIELDS = {
+        "market_cap": ("summaryDetail", "marketCap", 0),
+        "enterprise_value": ("summaryDetail", "enterpriseValue", 0),
+        "pe_ratio": ("financialData", "forwardPE", 0),
+        "forward_pe": ("financialData", "forwardPE", 0),
+        "price_to_book": ("defaultKeyStatistics", "priceToBook", 0),
+        "price_to_sales": ("summaryDetail", "priceToSalesTrailing12Months", 0),
+        "dividend_yield": ("summaryDetail", "dividendYield", 0),
+        "beta": ("defaultKeyStatistics", "beta", 0),
+        "52_week_high": ("summaryDetail", "fiftyTwoWeekHigh", 0),
+        "52_week_low": ("summaryDetail", "fiftyTwoWeekLow", 0),
+        "50_day_ma": ("summaryDetail", "fiftyDayAverage", 0),
+        "200_day_ma": ("summaryDetail", "twoHundredDayAverage", 0),
+        "peg_ratio": ("financialData", "pegRatio", 0),
+        "debt_to_equity": ("financialData", "debtToEquity", 0),
+        "return_on_equity": ("financialData", "returnOnEquity", 0),
+        "return_on_assets": ("financialData", "returnOnAssets", 0)
+    }
+
+    def __init__(self, session: Optional[httpx.AsyncClient] = None):
         self.base_url = "https://query1.finance.yahoo.com"
         self.user_agent = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+        # No explicit Accept-Encoding: httpx advertises exactly the
+        # codings it can decode (br only when the brotli extra is
+        # installed), so we never receive a body we cannot decompress
         self.headers = {
             "User-Agent": self.user_agent,
             "Accept": "application/json",
             "Accept-Language": "en-US,en;q=0.9",
-            "Accept-Encoding": "gzip, deflate, br",
             "Connection": "keep-alive",
             "Upgrade-Insecure-Requests": "1"
         }
         
-        # Rate limiting (conservative)
-        self.last_call_time = 0
-        self.min_interval = 1.0  # 1 second between calls
-    
-    async def _check_rate_limit(self) -> bool:
-        """Check if we can make an API call"""
-        current_time = datetime.now().timestamp()
-        
-        if current_time - self.last_call_time < self.min_interval:
-            return False
-        
-        return True
-    
+        # Rate limiting (conservative): sustained 1 req/s with a
+        # small burst so concurrent fetches queue instead of dropping.
+        # Bookkeeping runs on the monotonic clock so an NTP step or DST
+        # change cannot distort the pacing math
+        self.last_call_time = 0.0
+        self.min_interval = 1.0  # sustained seconds between calls
+        self._bucket = TokenBucket(
+            capacity=5.0,
+            refill_per_sec=1.0 / self.min_interval
+        )
+        self.timeout = 15.0
+        self.session = session
+        self._owns_session = session is None
+        self._breaker = CircuitBreaker("yahoo_finance")
+        self._singleflight = SingleFlight()
+        # Cap in-flight requests well inside the pool size so a large
+        # fan-out queues here instead of exhausting connections or
+        # tripping Yahoo's abuse detection
+        self._sem = asyncio.Semaphore(32)
+        # Hot-path LRU: repeat quote reads within the TTL are served
+        # in-process without any await
+        self._quote_cache: OrderedDict = OrderedDict()
+        # Slow-changing data also persists here so restarts do not
+        # re-fetch it
+        self._disk_cache_dir = Path(".cache/yahoo")
+
+    async def _cached(self, key: Tuple, ttl: float, fetcher) -> Optional[Any]:
+        """Serve key from the shared TTL cache, single-flighting misses
+
+        Concurrent misses for the same key collapse onto one upstream
+        fetch instead of each spending a token from the rate bucket.
+        """
+        return await response_cache.cached(
+            key, ttl,
+            lambda: self._singleflight.run(key, fetcher)
+        )
+
+    async def _with_disk_cache(self, key: Tuple, ttl: float, fetcher) -> Optional[Any]:
+        """Serve key from the on-disk JSON cache, fetching on a miss
+
+        Entries live under .cache/yahoo/<endpoint>/<md5-of-key>.json
+        with mtime-based TTLs, so slow-changing data survives process
+        restarts (and Yahoo outages) without a network round trip.
+        Writes go through a temp file and os.replace so a crash cannot
+        leave a half-written entry; cache errors fall open to the
+        fetch.
+        """
+        name = hashlib.md5(
+            ":".join(str(part) for part in key).encode()
+        ).hexdigest()
+        path = self._disk_cache_dir / str(key[0]) / f"{name}.json"
+        try:
+            if path.stat().st_mtime + ttl > time.time():
+                return json.loads(path.read_bytes())
+        except (OSError, ValueError):
+            pass  # missing, expired, or corrupt: fall through to fetch
+
+        value = await fetcher()
+        if value is not None:
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = path.with_suffix(".tmp")
+                tmp.write_text(json.dumps(value, default=_json_fallback))
+                os.replace(tmp, path)
+            except (OSError, TypeError) as e:
+                logger.error(f"Disk cache write failed for {path}: {e}")
+        return value
+
+    async def _get_session(self) -> httpx.AsyncClient:
+        """Get the shared HTTP session, or lazily create an owned one"""
+        if self.session is None:
+            self.session = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout, connect=2.0),
+                http2=HTTP2_AVAILABLE,
+                limits=httpx.Limits(
+                    max_connections=100,
+                    max_keepalive_connections=40,
+                    keepalive_expiry=30.0
+                )
+            )
+        return self.session
+
     async def _make_request(self, endpoint: str, params: Optional[Dict[str, str]] = None) -> Optional[Dict[str, Any]]:
         """Make API request to Yahoo Finance"""
         try:
-            # Check rate limit
-            if not await self._check_rate_limit():
-                return None
-            
+            # The old fixed-interval gate silently returned None for any
+            # call within 1s of the last — data loss, not rate limiting.
+            # The bucket makes over-limit callers wait for tokens instead
+            await self._bucket.acquire()
+
             # Prepare parameters
             if params is None:
                 params = {}
@@ -53,29 +282,71 @@ class YahooFinanceProvider:
             # Build URL
             url = f"{self.base_url}/{endpoint}"
             
-            # Make request
-            async with httpx.AsyncClient(timeout=15.0, headers=self.headers) as client:
-                response = await client.get(url, params=params)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    
-                    # Update rate limit tracking
-                    self.last_call_time = datetime.now().timestamp()
-                    
-                    return data
-                else:
-                    logger.error(f"Yahoo Finance API request failed: {response.status_code} - {response.text}")
-                    return None
-                    
+            # Make request on the pooled session (keep-alive, no per-call
+            # TCP/TLS handshake); headers ride along per request since the
+            # session may be shared with other providers. Transient
+            # failures (429/5xx, timeouts) retry with jittered backoff;
+            # a sustained outage opens the breaker and fails fast. The
+            # semaphore wraps only the send so backoff sleeps do not
+            # hold a slot
+            client = await self._get_session()
+
+            async def _send():
+                async with self._sem:
+                    return await client.get(
+                        url, params=params, headers=self.headers,
+                        timeout=self.timeout
+                    )
+
+            response = await request_with_retry(_send, breaker=self._breaker)
+
+            # Decode straight from the response bytes; json.loads
+            # accepts bytes and skips response.json()'s charset
+            # sniffing and intermediate str
+            data = json.loads(response.content)
+
+            # Update rate limit tracking
+            self.last_call_time = time.monotonic()
+
+            return data
+
+        except CircuitOpenError as e:
+            logger.warning(f"Yahoo Finance request skipped: {e}")
+            return None
         except Exception as e:
             logger.error(f"Failed to make Yahoo Finance request: {e}")
             return None
     
-    async def get_quote(self, symbol: str) -> Optional[Dict[str, Any]]:
-        """Get real-time quote for a symbol"""
+    async def get_quote(
+        self,
+        symbol: str,
+        ttl: float = 2.0
+    ) -> Optional[Dict[str, Any]]:
+        """Get real-time quote for a symbol
+
+        Repeat reads within ttl seconds are served from an in-process
+        LRU without touching the network; concurrent misses for the
+        same symbol share one upstream fetch.
+        """
+        entry = self._quote_cache.get(symbol)
+        if entry is not None and time.monotonic() - entry[0] < ttl:
+            self._quote_cache.move_to_end(symbol)
+            return entry[1]
+
+        quote = await self._singleflight.run(
+            ("quote", symbol),
+            lambda: self._fetch_quote(symbol)
+        )
+        if quote is not None:
+            self._quote_cache[symbol] = (time.monotonic(), quote)
+            self._quote_cache.move_to_end(symbol)
+            if len(self._quote_cache) > self._QUOTE_CACHE_MAX:
+                self._quote_cache.popitem(last=False)
+        return quote
+
+    async def _fetch_quote(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Fetch a quote from the API, bypassing the cache"""
         try:
-            endpoint = "v8/finance/chart/{symbol}"
             params = {
                 "interval": "1m",
                 "range": "1d",
@@ -83,7 +354,7 @@ class YahooFinanceProvider:
                 "events": "div,split"
             }
             
-            data = await self._make_request(endpoint.format(symbol=symbol), params)
+            data = await self._make_request(self._CHART_EP % symbol, params)
             if not data or "chart" not in data:
                 return None
             
@@ -104,29 +375,34 @@ class YahooFinanceProvider:
             low_prices = quote.get("low", [])
             volumes = quote.get("volume", [])
             
-            # Get latest values
-            current_price = close_prices[-1] if close_prices else 0
-            open_price = open_prices[-1] if open_prices else 0
-            high_price = high_prices[-1] if high_prices else 0
-            low_price = low_prices[-1] if low_prices else 0
-            volume = volumes[-1] if volumes else 0
-            
-            # Calculate change
-            previous_close = meta.get("previousClose", 0)
-            change = current_price - previous_close if previous_close > 0 else 0
-            change_percent = (change / previous_close * 100) if previous_close > 0 else 0
+            # Latest values, coerced to float once at extraction (the
+            # trailing bar can hold None)
+            current_price = float(close_prices[-1] or 0.0) if close_prices else 0.0
+            open_price = float(open_prices[-1] or 0.0) if open_prices else 0.0
+            high_price = float(high_prices[-1] or 0.0) if high_prices else 0.0
+            low_price = float(low_prices[-1] or 0.0) if low_prices else 0.0
+            volume = int(volumes[-1] or 0) if volumes else 0
+            
+            # One guard computes both deltas; the divide becomes a
+            # multiply by the cached reciprocal
+            previous_close = float(meta.get("previousClose") or 0.0)
+            if previous_close:
+                inv = 1.0 / previous_close
+                change = current_price - previous_close
+                change_percent = change * inv * 100.0
+            else:
+                change = change_percent = 0.0
             
-            # Parse result
             result = {
                 "symbol": symbol,
-                "price": float(current_price) if current_price else 0,
-                "change": float(change),
-                "change_percent": float(change_percent),
-                "volume": int(volume) if volume else 0,
-                "high": float(high_price) if high_price else 0,
-                "low": float(low_price) if low_price else 0,
-                "open": float(open_price) if open_price else 0,
-                "previous_close": float(previous_close),
+                "price": current_price,
+                "change": change,
+                "change_percent": change_percent,
+                "volume": volume,
+                "high": high_price,
+                "low": low_price,
+                "open": open_price,
+                "previous_close": previous_close,
                 "exchange": meta.get("exchangeName", "Unknown"),
                 "timestamp": datetime.utcnow()
             }
@@ -147,22 +423,98 @@ class YahooFinanceProvider:
             logger.error(f"Failed to get quote for {symbol} from Yahoo Finance: {e}")
             return None
     
+
+
+    async def get_quotes(self, symbols: list) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Get real-time quotes for many symbols in one API call
+
+        v7/finance/quote returns a compact quote object per symbol, so
+        a whole watchlist costs one small response instead of one
+        bandwidth-heavy chart payload each. get_quote keeps the chart
+        path for single symbols because it also derives OHLC and a
+        bid/ask estimate that the compact quote lacks.
+        """
+        try:
+            if not symbols:
+                return {}
+
+            datasets = await asyncio.gather(*[
+                self._make_request(
+                    self._QUOTE_EP,
+                    {"symbols": ",".join(chunk)}
+                )
+                for chunk in (
+                    symbols[i:i + self._MAX_BATCH]
+                    for i in range(0, len(symbols), self._MAX_BATCH)
+                )
+            ])
+
+            timestamp = datetime.utcnow()
+            quotes = {}
+            for data in datasets:
+                if not data or "quoteResponse" not in data:
+                    continue
+                for item in data["quoteResponse"].get("result") or []:
+                    symbol = item.get("symbol", "")
+                    if not symbol:
+                        continue
+                    quotes[symbol] = {
+                        "symbol": symbol,
+                        "price": item.get("regularMarketPrice", 0.0),
+                        "change": item.get("regularMarketChange", 0.0),
+                        "change_percent": item.get("regularMarketChangePercent", 0.0),
+                        "volume": item.get("regularMarketVolume", 0),
+                        "high": item.get("regularMarketDayHigh", 0.0),
+                        "low": item.get("regularMarketDayLow", 0.0),
+                        "open": item.get("regularMarketOpen", 0.0),
+                        "previous_close": item.get("regularMarketPreviousClose", 0.0),
+                        "exchange": item.get("fullExchangeName", "Unknown"),
+                        "timestamp": timestamp,
+                        "provider": "yahoo_finance"
+                    }
+
+            return quotes or None
+
+        except Exception as e:
+            logger.error(f"Failed to get Yahoo Finance quotes for {len(symbols)} symbols: {e}")
+            return None
+
     async def get_intraday_data(
         self, 
         symbol: str, 
         interval: str = "5m",
-        range: str = "1d"
+        range: str = "1d",
+        format: str = "columns"
     ) -> Optional[Dict[str, Any]]:
-        """Get intraday time series data"""
+        """Get intraday time series data (cached for a short interval)
+
+        Returns a "columns" dict of NumPy arrays (one contiguous array
+        per OHLCV field plus the timestamp index) so downstream code
+        consumes them without re-packing rows; pass format="records"
+        to also get the legacy list-of-dicts rows under "data".
+        """
+        return await self._cached(
+            ("yahoo", "intraday", symbol, interval, range, format),
+            TTL_INTRADAY,
+            lambda: self._fetch_intraday_data(symbol, interval, range, format)
+        )
+
+    async def _fetch_intraday_data(
+        self,
+        symbol: str,
+        interval: str = "5m",
+        range: str = "1d",
+        format: str = "columns"
+    ) -> Optional[Dict[str, Any]]:
+        """Fetch intraday data from the API, bypassing the cache"""
         try:
-            endpoint = "v8/finance/chart/{symbol}"
             params = {
                 "interval": interval,
                 "range": range,
                 "includePrePost": "false"
             }
             
-            data = await self._make_request(endpoint.format(symbol=symbol), params)
+            data = await self._make_request(self._CHART_EP % symbol, params)
             if not data or "chart" not in data:
                 return None
             
@@ -171,37 +523,42 @@ class YahooFinanceProvider:
                 return None
             
             result_data = chart["result"][0]
-            timestamp = result_data.get("timestamp", [])
-            indicators = result_data.get("indicators", {})
-            
-            # Extract OHLCV data
-            quote = indicators.get("quote", [{}])[0]
-            open_prices = quote.get("open", [])
-            high_prices = quote.get("high", [])
-            low_prices = quote.get("low", [])
-            close_prices = quote.get("close", [])
-            volumes = quote.get("volume", [])
-            
-            # Convert to structured format
+            ts, o, h, l, c, v = _assemble_ohlcv(result_data)
+
+            # SoA handoff: one contiguous ndarray per field instead of
+            # a 6-key dict per row; epoch values are UTC, so the
+            # timestamp column is too
             result = {
                 "symbol": symbol,
                 "interval": interval,
                 "range": range,
-                "data": []
+                "columns": {
+                    "timestamp": ts.astype("datetime64[s]"),
+                    "open": o,
+                    "high": h,
+                    "low": l,
+                    "close": c,
+                    "volume": v
+                }
             }
-            
-            for i in range(len(timestamp)):
-                if i < len(close_prices) and close_prices[i] is not None:
-                    data_point = {
-                        "timestamp": datetime.fromtimestamp(timestamp[i]),
-                        "open": float(open_prices[i]) if i < len(open_prices) and open_prices[i] is not None else 0,
-                        "high": float(high_prices[i]) if i < len(high_prices) and high_prices[i] is not None else 0,
-                        "low": float(low_prices[i]) if i < len(low_prices) and low_prices[i] is not None else 0,
-                        "close": float(close_prices[i]),
-                        "volume": int(volumes[i]) if i < len(volumes) and volumes[i] is not None else 0
+            if format == "records":
+                times = np.datetime_as_string(
+                    ts.astype("datetime64[s]"), unit="s"
+                ).tolist()
+                result["data"] = [
+                    {
+                        "timestamp": t,
+                        "open": op,
+                        "high": hi,
+                        "low": lo,
+                        "close": cl,
+                        "volume": vol
                     }
-                    result["data"].append(data_point)
-            
+                    for t, op, hi, lo, cl, vol in zip(
+                        times, o.tolist(), h.tolist(), l.tolist(),
+                        c.tolist(), v.tolist()
+                    )
+                ]
             return result
             
         except Exception as e:
@@ -211,18 +568,46 @@ class YahooFinanceProvider:
     async def get_daily_data(
         self, 
         symbol: str, 
-        range: str = "1mo"
+        range: str = "1mo",
+        format: str = "columns"
     ) -> Optional[Dict[str, Any]]:
-        """Get daily time series data"""
+        """Get daily time series data (cached for a few minutes)
+
+        Returns a "columns" dict of NumPy arrays like
+        get_intraday_data; pass format="records" to also get the
+        legacy rows under "data".
+        """
+        return await self._cached(
+            ("yahoo", "daily", symbol, range, format),
+            self._TTL_DAILY,
+            lambda: self._fetch_daily_data(symbol, range, format)
+        )
+
+    async def _fetch_daily_data(
+        self,
+        symbol: str,
+        range: str = "1mo",
+        format: str = "columns"
+    ) -> Optional[Dict[str, Any]]:
+        """Fetch daily data, bypassing the in-memory cache
+
+        The raw chart response (pure JSON, independent of the output
+        format) is what persists in the disk cache; the vectorized
+        parse re-runs on disk hits, which is cheap next to the network
+        round trip it saves.
+        """
         try:
-            endpoint = "v8/finance/chart/{symbol}"
             params = {
                 "interval": "1d",
                 "range": range,
                 "includePrePost": "false"
             }
             
-            data = await self._make_request(endpoint.format(symbol=symbol), params)
+            data = await self._with_disk_cache(
+                ("daily", symbol, range),
+                self._DISK_TTL_DAILY,
+                lambda: self._make_request(self._CHART_EP % symbol, params)
+            )
             if not data or "chart" not in data:
                 return None
             
@@ -231,36 +616,39 @@ class YahooFinanceProvider:
                 return None
             
             result_data = chart["result"][0]
-            timestamp = result_data.get("timestamp", [])
-            indicators = result_data.get("indicators", {})
-            
-            # Extract OHLCV data
-            quote = indicators.get("quote", [{}])[0]
-            open_prices = quote.get("open", [])
-            high_prices = quote.get("high", [])
-            low_prices = quote.get("low", [])
-            close_prices = quote.get("close", [])
-            volumes = quote.get("volume", [])
-            
-            # Convert to structured format
+            ts, o, h, l, c, v = _assemble_ohlcv(result_data)
+
+            # SoA handoff: one contiguous ndarray per field (UTC dates)
             result = {
                 "symbol": symbol,
                 "range": range,
-                "data": []
+                "columns": {
+                    "date": ts.astype("datetime64[s]").astype("datetime64[D]"),
+                    "open": o,
+                    "high": h,
+                    "low": l,
+                    "close": c,
+                    "volume": v
+                }
             }
-            
-            for i in range(len(timestamp)):
-                if i < len(close_prices) and close_prices[i] is not None:
-                    data_point = {
-                        "date": datetime.fromtimestamp(timestamp[i]).strftime("%Y-%m-%d"),
-                        "open": float(open_prices[i]) if i < len(open_prices) and open_prices[i] is not None else 0,
-                        "high": float(high_prices[i]) if i < len(high_prices) and high_prices[i] is not None else 0,
-                        "low": float(low_prices[i]) if i < len(low_prices) and low_prices[i] is not None else 0,
-                        "close": float(close_prices[i]),
-                        "volume": int(volumes[i]) if i < len(volumes) and volumes[i] is not None else 0
+            if format == "records":
+                dates = np.datetime_as_string(
+                    ts.astype("datetime64[s]").astype("datetime64[D]")
+                ).tolist()
+                result["data"] = [
+                    {
+                        "date": d,
+                        "open": op,
+                        "high": hi,
+                        "low": lo,
+                        "close": cl,
+                        "volume": vol
                     }
-                    result["data"].append(data_point)
-            
+                    for d, op, hi, lo, cl, vol in zip(
+                        dates, o.tolist(), h.tolist(), l.tolist(),
+                        c.tolist(), v.tolist()
+                    )
+                ]
             return result
             
         except Exception as e:
@@ -268,14 +656,25 @@ class YahooFinanceProvider:
             return None
     
     async def get_company_info(self, symbol: str) -> Optional[Dict[str, Any]]:
-        """Get company information"""
+        """Get company information (reference data, cached for a day)"""
+        return await self._cached(
+            ("yahoo", "company", symbol),
+            TTL_REFERENCE,
+            lambda: self._with_disk_cache(
+                ("company", symbol),
+                self._DISK_TTL_COMPANY,
+                lambda: self._fetch_company_info(symbol)
+            )
+        )
+
+    async def _fetch_company_info(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Fetch company info from the API, bypassing the cache"""
         try:
-            endpoint = "v10/finance/quoteSummary/{symbol}"
             params = {
                 "modules": "assetProfile,summaryDetail,summaryProfile"
             }
             
-            data = await self._make_request(endpoint.format(symbol=symbol), params)
+            data = await self._make_request(self._QS_EP % symbol, params)
             if not data or "quoteSummary" not in data:
                 return None
             
@@ -284,46 +683,34 @@ class YahooFinanceProvider:
                 return None
             
             result_data = quote_summary["result"][0]
-            
-            # Extract company profile
-            asset_profile = result_data.get("assetProfile", {})
-            summary_detail = result_data.get("summaryDetail", {})
-            summary_profile = result_data.get("summaryProfile", {})
-            
-            # Parse company data
-            result = {
-                "symbol": symbol,
-                "company_name": asset_profile.get("longName", ""),
-                "exchange": summary_profile.get("exchange", ""),
-                "industry": asset_profile.get("industry", ""),
-                "website": asset_profile.get("website", ""),
-                "description": asset_profile.get("longBusinessSummary", ""),
-                "sector": asset_profile.get("sector", ""),
-                "employees": asset_profile.get("fullTimeEmployees", 0),
-                "country": asset_profile.get("country", ""),
-                "city": asset_profile.get("city", ""),
-                "state": asset_profile.get("state", ""),
-                "zip": asset_profile.get("zip", ""),
-                "phone": asset_profile.get("phone", ""),
-                "market_cap": summary_detail.get("marketCap", 0),
-                "enterprise_value": summary_detail.get("enterpriseValue", 0)
-            }
-            
-            return result
+            return _QuoteSummaryView(
+                result_data, self._COMPANY_FIELDS, symbol
+            )
             
         except Exception as e:
             logger.error(f"Failed to get company info for {symbol} from Yahoo Finance: {e}")
             return None
     
     async def get_key_stats(self, symbol: str) -> Optional[Dict[str, Any]]:
-        """Get key statistics for a symbol"""
+        """Get key statistics (reference data, cached for a day)"""
+        return await self._cached(
+            ("yahoo", "stats", symbol),
+            TTL_REFERENCE,
+            lambda: self._with_disk_cache(
+                ("stats", symbol),
+                self._DISK_TTL_DAILY,
+                lambda: self._fetch_key_stats(symbol)
+            )
+        )
+
+    async def _fetch_key_stats(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Fetch key stats from the API, bypassing the cache"""
         try:
-            endpoint = "v10/finance/quoteSummary/{symbol}"
             params = {
                 "modules": "defaultKeyStatistics,summaryDetail,financialData"
             }
             
-            data = await self._make_request(endpoint.format(symbol=symbol), params)
+            data = await self._make_request(self._QS_EP % symbol, params)
             if not data or "quoteSummary" not in data:
                 return None
             
@@ -332,34 +719,9 @@ class YahooFinanceProvider:
                 return None
             
             result_data = quote_summary["result"][0]
-            
-            # Extract statistics
-            default_key_stats = result_data.get("defaultKeyStatistics", {})
-            summary_detail = result_data.get("summaryDetail", {})
-            financial_data = result_data.get("financialData", {})
-            
-            # Parse key stats
-            result = {
-                "symbol": symbol,
-                "market_cap": summary_detail.get("marketCap", 0),
-                "enterprise_value": summary_detail.get("enterpriseValue", 0),
-                "pe_ratio": financial_data.get("forwardPE", 0),
-                "forward_pe": financial_data.get("forwardPE", 0),
-                "price_to_book": default_key_stats.get("priceToBook", 0),
-                "price_to_sales": summary_detail.get("priceToSalesTrailing12Months", 0),
-                "dividend_yield": summary_detail.get("dividendYield", 0),
-                "beta": default_key_stats.get("beta", 0),
-                "52_week_high": summary_detail.get("fiftyTwoWeekHigh", 0),
-                "52_week_low": summary_detail.get("fiftyTwoWeekLow", 0),
-                "50_day_ma": summary_detail.get("fiftyDayAverage", 0),
-                "200_day_ma": summary_detail.get("twoHundredDayAverage", 0),
-                "peg_ratio": financial_data.get("pegRatio", 0),
-                "debt_to_equity": financial_data.get("debtToEquity", 0),
-                "return_on_equity": financial_data.get("returnOnEquity", 0),
-                "return_on_assets": financial_data.get("returnOnAssets", 0)
-            }
-            
-            return result
+            return _QuoteSummaryView(
+                result_data, self._STATS_FIELDS, symbol
+            )
             
         except Exception as e:
             logger.error(f"Failed to get key stats for {symbol} from Yahoo Finance: {e}")
@@ -368,42 +730,49 @@ class YahooFinanceProvider:
     async def search_symbols(self, query: str) -> Optional[Dict[str, Any]]:
         """Search for symbols by query"""
         try:
-            endpoint = "v1/finance/search"
             params = {
                 "q": query,
                 "quotesCount": 10,
                 "newsCount": 0
             }
             
-            data = await self._make_request(endpoint, params)
+            data = await self._make_request(self._SEARCH_EP, params)
             if not data or "quotes" not in data:
                 return None
             
-            quotes = data["quotes"]
-            
-            result = {
+            return {
                 "query": query,
-                "matches": []
+                "matches": [
+                    {
+                        "symbol": quote.get("symbol", ""),
+                        "name": quote.get("longname", quote.get("shortname", "")),
+                        "exchange": quote.get("exchange", ""),
+                        "type": quote.get("quoteType", ""),
+                        "score": quote.get("score", 0)
+                    }
+                    for quote in data["quotes"]
+                ]
             }
             
-            for quote in quotes:
-                symbol_info = {
-                    "symbol": quote.get("symbol", ""),
-                    "name": quote.get("longname", quote.get("shortname", "")),
-                    "exchange": quote.get("exchange", ""),
-                    "type": quote.get("quoteType", ""),
-                    "score": quote.get("score", 0)
-                }
-                result["matches"].append(symbol_info)
-            
-            return result
-            
         except Exception as e:
             logger.error(f"Failed to search symbols from Yahoo Finance: {e}")
             return None
     
     async def get_market_summary(self) -> Optional[Dict[str, Any]]:
-        """Get market summary data"""
+        """Get market summary data (cached for the quote TTL)
+
+        Every dashboard client asks for the same four indices, so one
+        2-second entry serves a whole burst of requests with a single
+        upstream call.
+        """
+        return await self._cached(
+            ("yahoo", "market_summary"),
+            TTL_QUOTE,
+            self._fetch_market_summary
+        )
+
+    async def _fetch_market_summary(self) -> Optional[Dict[str, Any]]:
+        """Fetch the market summary, bypassing the cache"""
         try:
             # Get major indices
             indices = ["^GSPC", "^DJI", "^IXIC", "^RUT"]  # S&P 500, Dow, NASDAQ, Russell 2000
@@ -413,8 +782,11 @@ class YahooFinanceProvider:
                 "timestamp": datetime.utcnow().isoformat()
             }
             
+            # All indices in one batched quote call: one compact
+            # response instead of four full chart payloads
+            quotes = await self.get_quotes(indices) or {}
             for index in indices:
-                quote = await self.get_quote(index)
+                quote = quotes.get(index)
                 if quote:
                     summary["indices"][index] = {
                         "name": self._get_index_name(index),
@@ -422,7 +794,7 @@ class YahooFinanceProvider:
                         "change": quote["change"],
                         "change_percent": quote["change_percent"]
                     }
-            
+
             return summary
             
         except Exception as e:
@@ -431,14 +803,7 @@ class YahooFinanceProvider:
     
     def _get_index_name(self, symbol: str) -> str:
         """Get human-readable name for index symbols"""
-        names = {
-            "^GSPC": "S&P 500",
-            "^DJI": "Dow Jones Industrial Average",
-            "^IXIC": "NASDAQ Composite",
-            "^RUT": "Russell 2000",
-            "^VIX": "CBOE Volatility Index"
-        }
-        return names.get(symbol, symbol)
+        return _INDEX_NAMES.get(symbol, symbol)
     
     async def test_connection(self) -> bool:
         """Test API connection"""
@@ -455,12 +820,18 @@ class YahooFinanceProvider:
     
     def get_rate_limit_info(self) -> Dict[str, Any]:
         """Get current rate limit information"""
-        current_time = datetime.now().timestamp()
-        time_since_last_call = current_time - self.last_call_time
-        
+        time_since_last_call = time.monotonic() - self.last_call_time
+
         return {
             "last_call": self.last_call_time,
             "time_since_last_call": round(time_since_last_call, 2),
             "min_interval": self.min_interval,
-            "can_make_call": time_since_last_call >= self.min_interval
+            "tokens_available": round(self._bucket.tokens, 2),
+            "can_make_call": self._bucket.tokens >= 1.0
         }
+
+    async def close(self):
+        """Close the HTTP session if this provider owns it"""
+        if self.session and self._owns_session:
+            await self.session.aclose()
+            self.session = None
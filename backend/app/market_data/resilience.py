@@ -0,0 +1,225 @@
+"""
+Retry and circuit-breaker helpers for provider HTTP calls
+"""
+
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import httpx
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    # httpx[http2] not installed; clients fall back to HTTP/1.1
+    HTTP2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Transient statuses worth retrying; anything else fails immediately
+RETRY_STATUS_CODES = (429, 502, 503, 504)
+
+class CircuitOpenError(Exception):
+    """Raised when a provider's circuit breaker is open"""
+
+class CircuitBreaker:
+    """Per-provider circuit breaker
+
+    Opens after failure_threshold consecutive failures and fails fast
+    for reset_timeout seconds, so a provider outage is waited out
+    instead of hammered with retries.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._consecutive_failures = 0
+        self._open_until = 0.0
+
+    @property
+    def open(self) -> bool:
+        """Whether calls should currently be short-circuited"""
+        return time.monotonic() < self._open_until
+
+    def record_success(self) -> None:
+        """Reset the failure streak after a successful call"""
+        self._consecutive_failures = 0
+
+    def record_failure(self) -> None:
+        """Count a failure, opening the circuit at the threshold"""
+        self._consecutive_failures += 1
+        if self._consecutive_failures >= self.failure_threshold:
+            self._open_until = time.monotonic() + self.reset_timeout
+            logger.warning(
+                f"Circuit open for {self.name} after "
+                f"{self._consecutive_failures} consecutive failures; "
+                f"failing fast for {self.reset_timeout:.0f}s"
+            )
+
+class TokenBucket:
+    """Continuously refilling token bucket with waiting acquire
+
+    Smooths a long-window call budget into a steady per-second refill
+    plus a small burst capacity, so an early burst cannot exhaust the
+    whole window up front, and throttled callers wait for tokens
+    instead of being rejected.
+    """
+
+    def __init__(self, capacity: float, refill_per_sec: float):
+        self.capacity = capacity
+        self.refill_per_sec = refill_per_sec
+        self.tokens = capacity
+        self._last_refill = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(
+            self.capacity,
+            self.tokens + (now - self._last_refill) * self.refill_per_sec
+        )
+        self._last_refill = now
+
+    async def acquire(self, n: float = 1.0) -> None:
+        """Take n tokens, sleeping until enough have refilled"""
+        while True:
+            async with self._lock:
+                self._refill()
+                if self.tokens >= n:
+                    self.tokens -= n
+                    return
+                wait = (n - self.tokens) / self.refill_per_sec
+            await asyncio.sleep(wait)
+
+    def shrink(self, factor: float = 0.5, floor: float = 10.0) -> None:
+        """Multiplicative decrease of burst capacity after a 429"""
+        self.capacity = max(floor, self.capacity * factor)
+        self.tokens = min(self.tokens, self.capacity)
+
+    def grow(self, step: float = 0.5, ceiling: float = 200.0) -> None:
+        """Additive increase of burst capacity after a success"""
+        self.capacity = min(ceiling, self.capacity + step)
+
+class SingleFlight:
+    """Collapse duplicate concurrent calls onto one in-flight request
+
+    When the same key is requested while a fetch for it is pending, the
+    duplicates await the first call's future instead of going upstream
+    themselves, so API usage is bounded by the set of unique keys
+    rather than the call count.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Tuple, asyncio.Future] = {}
+
+    async def run(
+        self,
+        key: Tuple,
+        fetcher: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Await fetcher for key, sharing any already-pending fetch"""
+        future = self._inflight.get(key)
+        if future is not None:
+            return await future
+
+        self._inflight[key] = future = (
+            asyncio.get_running_loop().create_future()
+        )
+        try:
+            result = await fetcher()
+        except BaseException as exc:
+            # Resolve waiters with the real failure. Cancelling the
+            # future instead would raise CancelledError in waiters that
+            # were never themselves cancelled — it slips past every
+            # except-Exception handler, and a cancelled race loser
+            # holding leadership would take its waiters down with it.
+            future.set_exception(exc)
+            # Retrieve it so an unawaited future does not log a
+            # never-retrieved warning
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._inflight.pop(key, None)
+
+def _backoff_delay(
+    attempt: int,
+    base_delay: float,
+    max_delay: float,
+    retry_after: Optional[str] = None
+) -> float:
+    """Full-jitter exponential backoff, honoring Retry-After when sane"""
+    if retry_after is not None:
+        try:
+            return min(float(retry_after), max_delay)
+        except ValueError:
+            pass
+    return random.uniform(0.0, min(max_delay, base_delay * (2 ** attempt)))
+
+async def request_with_retry(
+    send: Callable[[], Awaitable[httpx.Response]],
+    breaker: Optional[CircuitBreaker] = None,
+    retries: int = 4,
+    base_delay: float = 0.25,
+    max_delay: float = 8.0,
+    on_throttle: Optional[Callable[[], None]] = None
+) -> httpx.Response:
+    """Send a request, retrying transient failures with jittered backoff
+
+    send is awaited up to retries + 1 times. 429/502/503/504 responses
+    and timeouts back off exponentially with full jitter (honoring
+    Retry-After when the server supplies one); other error statuses
+    raise immediately via raise_for_status. on_throttle is invoked on
+    each 429 so callers can shrink their rate budget. When a breaker is
+    given it is consulted before sending and updated with the outcome;
+    while open, calls fail fast with CircuitOpenError.
+    """
+    if breaker is not None and breaker.open:
+        raise CircuitOpenError(f"{breaker.name} circuit is open")
+
+    for attempt in range(retries + 1):
+        try:
+            response = await send()
+        except (httpx.TimeoutException, httpx.TransportError):
+            if attempt < retries:
+                await asyncio.sleep(
+                    _backoff_delay(attempt, base_delay, max_delay)
+                )
+                continue
+            if breaker is not None:
+                breaker.record_failure()
+            raise
+
+        if response.status_code in RETRY_STATUS_CODES:
+            if response.status_code == 429 and on_throttle is not None:
+                on_throttle()
+            if attempt < retries:
+                await asyncio.sleep(
+                    _backoff_delay(
+                        attempt, base_delay, max_delay,
+                        response.headers.get("Retry-After")
+                    )
+                )
+                continue
+
+        try:
+            response.raise_for_status()
+        except httpx.HTTPStatusError:
+            if breaker is not None:
+                breaker.record_failure()
+            raise
+
+        if breaker is not None:
+            breaker.record_success()
+        return response
@@ -0,0 +1,110 @@
+"""
+Latency-aware routing across market data providers
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+class MarketDataRouter:
+    """Route quote requests to the currently-best provider
+
+    Keeps an exponentially weighted moving average of observed latency
+    per provider and dispatches each call to the lowest-scoring one,
+    skipping providers whose circuit breaker is open. If the primary
+    has not answered within hedge_delay seconds, the runner-up is fired
+    as a hedge and the first non-empty answer wins — median latency is
+    unchanged, but one provider's slow tail no longer blocks the
+    caller. Complements the processor's own provider race, which spans
+    all configured providers per cycle; the router is for callers that
+    hold a few provider instances directly.
+    """
+
+    def __init__(
+        self,
+        providers: Dict[str, Any],
+        hedge_delay: float = 0.15,
+        ewma_alpha: float = 0.2
+    ):
+        self.providers = providers
+        self.hedge_delay = hedge_delay
+        self.ewma_alpha = ewma_alpha
+        # Optimistic prior so new providers get tried early
+        self._latency_ewma: Dict[str, float] = {
+            name: 0.25 for name in providers
+        }
+
+    def _score(self, name: str) -> float:
+        """Smaller is better; open circuits rank last"""
+        breaker = getattr(self.providers[name], "_breaker", None)
+        if breaker is not None and breaker.open:
+            return float("inf")
+        return self._latency_ewma[name]
+
+    def _record_latency(self, name: str, elapsed: float) -> None:
+        """Fold one observation into the provider's EWMA"""
+        alpha = self.ewma_alpha
+        self._latency_ewma[name] = (
+            (1 - alpha) * self._latency_ewma[name] + alpha * elapsed
+        )
+
+    async def _timed_quote(
+        self, name: str, symbol: str
+    ) -> Optional[Dict[str, Any]]:
+        """Fetch a quote and record the provider's response time"""
+        start = time.monotonic()
+        quote = await self.providers[name].get_quote(symbol)
+        self._record_latency(name, time.monotonic() - start)
+        return quote
+
+    async def get_quote(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Get a quote from the best provider, hedging slow responses"""
+        if not self.providers:
+            return None
+
+        ranked = sorted(self.providers, key=self._score)
+        available = [
+            name for name in ranked if self._score(name) != float("inf")
+        ] or ranked
+
+        primary = asyncio.create_task(
+            self._timed_quote(available[0], symbol)
+        )
+        done, _ = await asyncio.wait({primary}, timeout=self.hedge_delay)
+        if done:
+            result = primary.result()
+            if result is not None:
+                return result
+            # Primary answered empty; fall through to the runner-up
+            if len(available) > 1:
+                return await self._timed_quote(available[1], symbol)
+            return None
+
+        # Primary is slow: hedge with the runner-up, first non-empty
+        # answer wins and the loser is cancelled
+        tasks = {primary}
+        if len(available) > 1:
+            tasks.add(
+                asyncio.create_task(self._timed_quote(available[1], symbol))
+            )
+        while tasks:
+            done, tasks = await asyncio.wait(
+                tasks, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                result = task.result()
+                if result is not None:
+                    for pending in tasks:
+                        pending.cancel()
+                    return result
+        return None
+
+    def get_latency_info(self) -> Dict[str, float]:
+        """Current latency EWMA per provider, for diagnostics"""
+        return {
+            name: round(value, 4)
+            for name, value in self._latency_ewma.items()
+        }
@@ -3,9 +3,11 @@ WebSocket manager for real-time market data broadcasting
 """
 
 import asyncio
+import heapq
 import json
 import logging
-from typing import Dict, List, Set, Optional, Any
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Set, Optional, Any, Union
 from datetime import datetime
 import time
 
@@ -15,26 +17,128 @@ from app.config import settings
 
 logger = logging.getLogger(__name__)
 
+def encode_message(message: Dict[str, Any]) -> bytes:
+    """Serialize an outbound message once, in compact form, as bytes
+
+    Compact separators trim the whitespace stdlib json emits by default
+    (noticeable across thousands of frames per second), and default=str
+    keeps datetime values from provider payloads serializable. Encoding
+    to UTF-8 here means a fan-out pays the str->bytes conversion once
+    rather than inside send_text for every subscriber.
+    """
+    return json.dumps(message, separators=(",", ":"), default=str).encode()
+
+# Canned reply frames, encoded once at import. The pong/welcome/error
+# replies are static apart from the timestamp (and connection id), so
+# the hot paths concatenate byte fragments instead of building a dict
+# and running json.dumps per message.
+_PONG_PREFIX = b'{"type":"pong","timestamp":"'
+_WELCOME_PREFIX = b'{"type":"connection_established","connection_id":"'
+_WELCOME_MID = b'","timestamp":"'
+_WELCOME_SUFFIX = b'","message":"Welcome to MarketVision Pro WebSocket API"}'
+_INVALID_JSON_PREFIX = b'{"type":"error","message":"Invalid JSON format","timestamp":"'
+_UNKNOWN_TYPE_PREFIX = b'{"type":"error","message":"Unknown message type: '
+_UNKNOWN_TYPE_MID = b'","timestamp":"'
+_SUB_ACK_PREFIX = b'{"type":"subscription_response","symbol":"'
+_UNSUB_ACK_PREFIX = b'{"type":"unsubscription_response","symbol":"'
+_ACK_SUCCESS_MID = b'","success":'
+_ACK_TS_MID = b',"timestamp":"'
+_TS_SUFFIX = b'"}'
+
+# Millisecond-cached UTC timestamp: every envelope, ack and pong built
+# within the same millisecond shares one formatted string instead of
+# each allocating and formatting its own datetime
+_last_ts_ns = 0
+_last_ts_str = ""
+
+def now_iso() -> str:
+    """Current UTC time as an ISO-8601 string, cached to ~1ms"""
+    global _last_ts_ns, _last_ts_str
+    ns = time.time_ns()
+    if ns - _last_ts_ns >= 1_000_000:
+        _last_ts_ns = ns
+        _last_ts_str = datetime.utcnow().isoformat()
+    return _last_ts_str
+
+@dataclass(slots=True)
+class ConnectionMeta:
+    """Per-connection bookkeeping
+
+    A slots instance is a fraction of the size of the dict it
+    replaces and makes last_activity updates an attribute store
+    instead of a hashed dict write — both matter with tens of
+    thousands of connections.
+    """
+    connected_at: str = ""
+    last_activity: float = 0.0
+    subscription_count: int = 0
+
 class ConnectionManager:
     """Manages WebSocket connections"""
     
+    # Bounded per-connection backlog: a client this far behind on a
+    # live feed is better disconnected than buffered without limit
+    OUTBOUND_QUEUE_SIZE = 256
+    # Cap for one coalesced batch frame; keeps a burst from growing an
+    # arbitrarily large buffer per connection
+    MAX_BATCH_BYTES = 64 * 1024
+    # Upper bound on the metadata free-list; enough to absorb a
+    # reconnect storm without pinning memory forever
+    META_POOL_MAX = 1024
+    # How often a successfully-sending writer refreshes its
+    # connection's liveness; coarse on purpose so a hot feed does not
+    # pay the bookkeeping per frame
+    ACTIVITY_REFRESH_SECS = 5.0
+
     def __init__(self):
         self.active_connections: Dict[str, WebSocket] = {}
         self.connection_subscriptions: Dict[str, Set[str]] = {}  # connection_id -> symbols
-        self.symbol_connections: Dict[str, Set[str]] = {}  # symbol -> connection_ids
-        self.connection_metadata: Dict[str, Dict[str, Any]] = {}  # connection_id -> metadata
+        # symbol -> connection_id -> outbound queue. Storing the queue
+        # alongside the id means the broadcast fan-out walks
+        # ready-to-use queues instead of hashing every subscriber id
+        # through connection_queues per message
+        self.symbol_connections: Dict[str, Dict[str, asyncio.Queue]] = {}
+        self.connection_metadata: Dict[str, ConnectionMeta] = {}  # connection_id -> metadata
+        self.connection_queues: Dict[str, asyncio.Queue] = {}  # connection_id -> outbound queue
+        self.writer_tasks: Dict[str, asyncio.Task] = {}  # connection_id -> writer task
+        self.websocket_ids: Dict[WebSocket, str] = {}  # reverse index: websocket -> connection_id
+        # Reused buffer for dead subscribers found during a fan-out;
+        # broadcasts run back-to-back on one loop, so clearing one list
+        # beats allocating a fresh (almost always empty) one per call
+        self._failed_connections: List[str] = []
+        # Min-heap of (last_activity, connection_id) with lazy
+        # deletion: stale duplicates stay in the heap and are skipped
+        # on pop when they no longer match the metadata, so the
+        # stale-connection scan pops only what is actually old instead
+        # of walking every connection
+        self._activity_heap: List[tuple] = []
+        # Free-list of metadata instances: a reconnect storm churns
+        # through thousands of short-lived connections, and reusing
+        # them spares the small-object allocator
+        self._meta_pool: List[ConnectionMeta] = []
         
     async def connect(self, websocket: WebSocket, connection_id: str):
         """Accept a new WebSocket connection"""
         try:
             await websocket.accept()
             self.active_connections[connection_id] = websocket
+            self.websocket_ids[websocket] = connection_id
             self.connection_subscriptions[connection_id] = set()
-            self.connection_metadata[connection_id] = {
-                "connected_at": datetime.utcnow().isoformat(),
-                "last_activity": time.time(),
-                "subscription_count": 0
-            }
+            ts = time.time()
+            meta = self._meta_pool.pop() if self._meta_pool else ConnectionMeta()
+            meta.connected_at = now_iso()
+            meta.last_activity = ts
+            meta.subscription_count = 0
+            self.connection_metadata[connection_id] = meta
+            heapq.heappush(self._activity_heap, (ts, connection_id))
+            # Producers enqueue; a dedicated writer drains onto the
+            # socket, so a backpressured client never stalls the
+            # broadcaster
+            queue: asyncio.Queue = asyncio.Queue(maxsize=self.OUTBOUND_QUEUE_SIZE)
+            self.connection_queues[connection_id] = queue
+            self.writer_tasks[connection_id] = asyncio.create_task(
+                self._writer(connection_id, websocket, queue)
+            )
             
             logger.info(f"WebSocket connected: {connection_id}")
             
@@ -42,56 +146,141 @@ class ConnectionManager:
             logger.error(f"Failed to accept WebSocket connection: {e}")
             raise
     
+    async def _writer(self, connection_id: str, websocket: WebSocket, queue: asyncio.Queue):
+        """Drain one connection's outbound queue onto its socket
+
+        When a burst has queued several messages, everything
+        immediately available is coalesced into one
+        market_data_batch frame (capped at MAX_BATCH_BYTES), cutting
+        the frame and syscall count for bursty feeds; an up-to-date
+        client still gets one frame per message.
+        """
+        try:
+            while True:
+                message = await queue.get()
+                batch = [message]
+                size = len(message)
+                while size < self.MAX_BATCH_BYTES:
+                    try:
+                        nxt = queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        break
+                    batch.append(nxt)
+                    size += len(nxt)
+                if len(batch) == 1:
+                    await websocket.send_bytes(message)
+                else:
+                    await websocket.send_bytes(
+                        b'{"type":"market_data_batch","messages":['
+                        + b",".join(batch) + b"]}"
+                    )
+                # A delivered frame proves the client is alive:
+                # refresh liveness so a passively streaming subscriber
+                # is not reaped as idle, throttled so the refresh
+                # costs a heap push at most every few seconds
+                meta = self.connection_metadata.get(connection_id)
+                if (
+                    meta is not None
+                    and time.time() - meta.last_activity >= self.ACTIVITY_REFRESH_SECS
+                ):
+                    self._touch_activity(connection_id, meta)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Writer failed for connection {connection_id}: {e}")
+            self.disconnect(connection_id)
+
     def disconnect(self, connection_id: str):
         """Remove a WebSocket connection"""
         try:
-            # Remove from active connections
-            if connection_id in self.active_connections:
-                del self.active_connections[connection_id]
+            # Remove from active connections and the reverse index
+            websocket = self.active_connections.pop(connection_id, None)
+            if websocket is not None:
+                self.websocket_ids.pop(websocket, None)
             
             # Remove subscriptions
             if connection_id in self.connection_subscriptions:
                 symbols = self.connection_subscriptions[connection_id]
                 for symbol in symbols:
-                    if symbol in self.symbol_connections:
-                        self.symbol_connections[symbol].discard(connection_id)
-                        if not self.symbol_connections[symbol]:
+                    subscribers = self.symbol_connections.get(symbol)
+                    if subscribers is not None:
+                        subscribers.pop(connection_id, None)
+                        if not subscribers:
                             del self.symbol_connections[symbol]
                 del self.connection_subscriptions[connection_id]
             
-            # Remove metadata
-            if connection_id in self.connection_metadata:
-                del self.connection_metadata[connection_id]
+            # Remove metadata, returning the instance to the free-list
+            # (connect overwrites every field on reuse)
+            meta = self.connection_metadata.pop(connection_id, None)
+            if meta is not None and len(self._meta_pool) < self.META_POOL_MAX:
+                self._meta_pool.append(meta)
+            
+            # Stop the writer and drop its queue
+            task = self.writer_tasks.pop(connection_id, None)
+            if task is not None:
+                task.cancel()
+            self.connection_queues.pop(connection_id, None)
             
             logger.info(f"WebSocket disconnected: {connection_id}")
             
         except Exception as e:
             logger.error(f"Error during WebSocket disconnect: {e}")
     
+    def _touch_activity(self, connection_id: str, meta: ConnectionMeta) -> None:
+        """Record liveness for the stale-connection scan
+
+        Touches within a second of the previous one are skipped
+        entirely: last_activity stays matched to its newest heap entry
+        (the invariant lazy deletion relies on) and no hot path can
+        grow the heap by one entry per message.
+        """
+        ts = time.time()
+        if ts - meta.last_activity < 1.0:
+            return
+        meta.last_activity = ts
+        heapq.heappush(self._activity_heap, (ts, connection_id))
+
+    def pop_stale_connections(self, max_idle: float) -> List[str]:
+        """Pop connections idle for longer than max_idle seconds
+
+        A heap entry only counts if it still matches the connection's
+        latest last_activity; superseded entries are discarded as they
+        surface (lazy deletion), so cost scales with activity churn
+        rather than the connection count.
+        """
+        cutoff = time.time() - max_idle
+        heap = self._activity_heap
+        stale = []
+        while heap and heap[0][0] < cutoff:
+            ts, connection_id = heapq.heappop(heap)
+            meta = self.connection_metadata.get(connection_id)
+            if meta is not None and meta.last_activity == ts:
+                stale.append(connection_id)
+        return stale
+
     async def subscribe_to_symbol(self, connection_id: str, symbol: str):
-        """Subscribe a connection to a symbol"""
+        """Subscribe a connection to a symbol
+
+        Written with setdefault and local references so a market-open
+        burst of subscriptions pays one dict lookup per structure
+        instead of a check-then-index pair.
+        """
         try:
             if connection_id not in self.active_connections:
                 logger.warning(f"Connection {connection_id} not found for subscription")
                 return False
-            
-            # Add to connection subscriptions
-            if connection_id not in self.connection_subscriptions:
-                self.connection_subscriptions[connection_id] = set()
-            self.connection_subscriptions[connection_id].add(symbol)
-            
-            # Add to symbol connections
-            if symbol not in self.symbol_connections:
-                self.symbol_connections[symbol] = set()
-            self.symbol_connections[symbol].add(connection_id)
-            
-            # Update metadata
-            if connection_id in self.connection_metadata:
-                self.connection_metadata[connection_id]["subscription_count"] = len(
-                    self.connection_subscriptions[connection_id]
-                )
-                self.connection_metadata[connection_id]["last_activity"] = time.time()
-            
+
+            subs = self.connection_subscriptions.setdefault(connection_id, set())
+            subs.add(symbol)
+            self.symbol_connections.setdefault(symbol, {})[connection_id] = (
+                self.connection_queues[connection_id]
+            )
+
+            meta = self.connection_metadata.get(connection_id)
+            if meta is not None:
+                meta.subscription_count = len(subs)
+                self._touch_activity(connection_id, meta)
+
             logger.info(f"Connection {connection_id} subscribed to {symbol}")
             return True
             
@@ -107,18 +296,20 @@ class ConnectionManager:
                 self.connection_subscriptions[connection_id].discard(symbol)
             
             # Remove from symbol connections
-            if symbol in self.symbol_connections:
-                self.symbol_connections[symbol].discard(connection_id)
-                if not self.symbol_connections[symbol]:
+            subscribers = self.symbol_connections.get(symbol)
+            if subscribers is not None:
+                subscribers.pop(connection_id, None)
+                if not subscribers:
                     del self.symbol_connections[symbol]
             
             # Update metadata
-            if connection_id in self.connection_metadata:
-                self.connection_metadata[connection_id]["subscription_count"] = len(
+            meta = self.connection_metadata.get(connection_id)
+            if meta is not None:
+                meta.subscription_count = len(
                     self.connection_subscriptions[connection_id]
                 )
-                self.connection_metadata[connection_id]["last_activity"] = time.time()
-            
+                self._touch_activity(connection_id, meta)
+
             logger.info(f"Connection {connection_id} unsubscribed from {symbol}")
             return True
             
@@ -127,36 +318,39 @@ class ConnectionManager:
             return False
     
     async def broadcast_to_symbol(self, symbol: str, message: Dict[str, Any]):
-        """Broadcast a message to all connections subscribed to a symbol"""
+        """Broadcast a message to all connections subscribed to a symbol
+
+        Producers only enqueue; each connection's writer task puts the
+        frame on the wire, so a slow socket cannot stall the caller.
+        """
         try:
-            if symbol not in self.symbol_connections:
+            # Atomic snapshot: concurrent (un)subscribes and the
+            # disconnect pass below mutate the live mapping, never the
+            # list being iterated
+            subscribers = self.symbol_connections.get(symbol)
+            if not subscribers:
                 return 0
-            
-            message_str = json.dumps(message)
+
+            message_str = encode_message(message)
+            subscribers = list(subscribers.items())
+
             sent_count = 0
-            failed_connections = []
-            
-            for connection_id in self.symbol_connections[symbol]:
+            failed_connections = self._failed_connections
+            failed_connections.clear()
+            for connection_id, queue in subscribers:
                 try:
-                    websocket = self.active_connections.get(connection_id)
-                    if websocket:
-                        await websocket.send_text(message_str)
-                        sent_count += 1
-                        
-                        # Update last activity
-                        if connection_id in self.connection_metadata:
-                            self.connection_metadata[connection_id]["last_activity"] = time.time()
-                    else:
-                        failed_connections.append(connection_id)
-                        
-                except Exception as e:
-                    logger.error(f"Failed to send message to connection {connection_id}: {e}")
+                    queue.put_nowait(message_str)
+                except asyncio.QueueFull:
+                    # The client is too far behind a live feed to catch
+                    # up within bounded memory
+                    logger.warning(f"Disconnecting slow consumer {connection_id}: outbound queue full")
                     failed_connections.append(connection_id)
-            
-            # Clean up failed connections
+                    continue
+                sent_count += 1
+
             for connection_id in failed_connections:
                 self.disconnect(connection_id)
-            
+
             return sent_count
             
         except Exception as e:
@@ -164,52 +358,64 @@ class ConnectionManager:
             return 0
     
     async def broadcast_to_all(self, message: Dict[str, Any]):
-        """Broadcast a message to all active connections"""
+        """Broadcast a message to all active connections
+
+        Same enqueue-only fan-out as broadcast_to_symbol.
+        """
         try:
-            message_str = json.dumps(message)
+            message_str = encode_message(message)
+            connections = list(self.connection_queues.items())
+
             sent_count = 0
-            failed_connections = []
-            
-            for connection_id, websocket in self.active_connections.items():
+            failed_connections = self._failed_connections
+            failed_connections.clear()
+            for connection_id, queue in connections:
                 try:
-                    await websocket.send_text(message_str)
-                    sent_count += 1
-                    
-                    # Update last activity
-                    if connection_id in self.connection_metadata:
-                        self.connection_metadata[connection_id]["last_activity"] = time.time()
-                        
-                except Exception as e:
-                    logger.error(f"Failed to send message to connection {connection_id}: {e}")
+                    queue.put_nowait(message_str)
+                except asyncio.QueueFull:
+                    logger.warning(f"Disconnecting slow consumer {connection_id}: outbound queue full")
                     failed_connections.append(connection_id)
-            
-            # Clean up failed connections
+                    continue
+                sent_count += 1
+
             for connection_id in failed_connections:
                 self.disconnect(connection_id)
-            
+
             return sent_count
             
         except Exception as e:
             logger.error(f"Failed to broadcast message to all connections: {e}")
             return 0
     
-    async def send_personal_message(self, connection_id: str, message: Dict[str, Any]):
-        """Send a message to a specific connection"""
+    async def send_raw(self, connection_id: str, payload: bytes) -> bool:
+        """Send an already-encoded frame to a specific connection
+
+        For callers that assemble their payload from precomputed byte
+        templates; skips the per-message dict build and json.dumps.
+        """
         try:
-            websocket = self.active_connections.get(connection_id)
-            if websocket:
-                message_str = json.dumps(message)
-                await websocket.send_text(message_str)
-                
-                # Update last activity
-                if connection_id in self.connection_metadata:
-                    self.connection_metadata[connection_id]["last_activity"] = time.time()
-                
+            queue = self.connection_queues.get(connection_id)
+            if queue is not None:
+                queue.put_nowait(payload)
+                meta = self.connection_metadata.get(connection_id)
+                if meta is not None:
+                    self._touch_activity(connection_id, meta)
                 return True
-            else:
-                logger.warning(f"Connection {connection_id} not found for personal message")
-                return False
-                
+            logger.warning(f"Connection {connection_id} not found for raw send")
+            return False
+        except Exception as e:
+            logger.error(f"Failed to send raw payload to {connection_id}: {e}")
+            return False
+
+    async def send_personal_message(self, connection_id: str, message: Dict[str, Any]):
+        """Send a message to a specific connection
+
+        Thin wrapper over send_raw for callers holding a dict; rides
+        the same outbound queue as broadcasts so per-connection
+        ordering is preserved.
+        """
+        try:
+            return await self.send_raw(connection_id, encode_message(message))
         except Exception as e:
             logger.error(f"Failed to send personal message to {connection_id}: {e}")
             return False
@@ -220,7 +426,7 @@ class ConnectionManager:
     
     def get_subscription_count(self, symbol: str) -> int:
         """Get the number of connections subscribed to a symbol"""
-        return len(self.symbol_connections.get(symbol, set()))
+        return len(self.symbol_connections.get(symbol, ()))
     
     def get_connection_info(self) -> Dict[str, Any]:
         """Get information about all connections"""
@@ -231,17 +437,29 @@ class ConnectionManager:
                 symbol: len(connections) 
                 for symbol, connections in self.symbol_connections.items()
             },
-            "connection_details": self.connection_metadata
+            "connection_details": {
+                connection_id: asdict(meta)
+                for connection_id, meta in self.connection_metadata.items()
+            }
         }
 
 class WebSocketManager:
     """Main WebSocket manager for the application"""
-    
+
+    # Staged market data updates are flushed to subscribers on this
+    # cadence; within a window the latest snapshot per symbol wins
+    FLUSH_INTERVAL = 0.02
+
     def __init__(self):
         self.connection_manager = ConnectionManager()
         self.connection_counter = 0
         self.health_check_task = None
         self.is_running = False
+        self.broadcast_queue: asyncio.Queue = asyncio.Queue(maxsize=1000)
+        self.broadcast_task = None
+        self.dropped_broadcasts = 0
+        self._pending: Dict[str, Dict[str, Any]] = {}  # symbol -> latest staged update
+        self._flush_task = None
     
     async def connect(self, websocket: WebSocket):
         """Handle new WebSocket connection"""
@@ -251,15 +469,14 @@ class WebSocketManager:
             
             await self.connection_manager.connect(websocket, connection_id)
             
-            # Send welcome message
-            welcome_message = {
-                "type": "connection_established",
-                "connection_id": connection_id,
-                "timestamp": datetime.utcnow().isoformat(),
-                "message": "Welcome to MarketVision Pro WebSocket API"
-            }
-            
-            await self.connection_manager.send_personal_message(connection_id, welcome_message)
+            # Send welcome message (static template except for the
+            # connection id and timestamp)
+            ts = now_iso().encode()
+            await self.connection_manager.send_raw(
+                connection_id,
+                _WELCOME_PREFIX + connection_id.encode()
+                + _WELCOME_MID + ts + _WELCOME_SUFFIX
+            )
             
         except Exception as e:
             logger.error(f"Failed to handle WebSocket connection: {e}")
@@ -268,43 +485,36 @@ class WebSocketManager:
     def disconnect(self, websocket: WebSocket):
         """Handle WebSocket disconnection"""
         try:
-            # Find connection by websocket
-            connection_id = None
-            for cid, ws in self.connection_manager.active_connections.items():
-                if ws == websocket:
-                    connection_id = cid
-                    break
-            
+            # O(1) reverse lookup instead of scanning every connection
+            connection_id = self.connection_manager.websocket_ids.get(websocket)
             if connection_id:
                 self.connection_manager.disconnect(connection_id)
             
         except Exception as e:
             logger.error(f"Failed to handle WebSocket disconnection: {e}")
     
-    async def handle_message(self, websocket: WebSocket, message: str):
-        """Handle incoming WebSocket message"""
+    async def handle_message(self, websocket: WebSocket, message: Union[str, bytes]):
+        """Handle incoming WebSocket message
+
+        Accepts the frame payload as bytes or str; json.loads parses
+        bytes directly, so binary frames skip a decode pass.
+        """
         try:
-            # Find connection by websocket
-            connection_id = None
-            for cid, ws in self.connection_manager.active_connections.items():
-                if ws == websocket:
-                    connection_id = cid
-                    break
-            
+            # O(1) reverse lookup instead of scanning every connection
+            connection_id = self.connection_manager.websocket_ids.get(websocket)
             if not connection_id:
                 logger.warning("Received message from unknown connection")
                 return
-            
-            # Parse message
+
+            # Parse message (ValueError also covers invalid UTF-8 in
+            # a bytes payload)
             try:
                 data = json.loads(message)
-            except json.JSONDecodeError:
-                error_msg = {
-                    "type": "error",
-                    "message": "Invalid JSON format",
-                    "timestamp": datetime.utcnow().isoformat()
-                }
-                await self.connection_manager.send_personal_message(connection_id, error_msg)
+            except ValueError:
+                ts = now_iso().encode()
+                await self.connection_manager.send_raw(
+                    connection_id, _INVALID_JSON_PREFIX + ts + _TS_SUFFIX
+                )
                 return
             
             # Handle different message types
@@ -314,62 +524,122 @@ class WebSocketManager:
                 symbol = data.get("symbol")
                 if symbol:
                     success = await self.connection_manager.subscribe_to_symbol(connection_id, symbol)
-                    response = {
-                        "type": "subscription_response",
-                        "symbol": symbol,
-                        "success": success,
-                        "timestamp": datetime.utcnow().isoformat()
-                    }
-                    await self.connection_manager.send_personal_message(connection_id, response)
-            
+                    await self.connection_manager.send_raw(
+                        connection_id,
+                        _SUB_ACK_PREFIX + json.dumps(str(symbol))[1:-1].encode()
+                        + _ACK_SUCCESS_MID + (b"true" if success else b"false")
+                        + _ACK_TS_MID + now_iso().encode() + _TS_SUFFIX
+                    )
+
             elif message_type == "unsubscribe":
                 symbol = data.get("symbol")
                 if symbol:
                     success = await self.connection_manager.unsubscribe_from_symbol(connection_id, symbol)
-                    response = {
-                        "type": "unsubscription_response",
-                        "symbol": symbol,
-                        "success": success,
-                        "timestamp": datetime.utcnow().isoformat()
-                    }
-                    await self.connection_manager.send_personal_message(connection_id, response)
+                    await self.connection_manager.send_raw(
+                        connection_id,
+                        _UNSUB_ACK_PREFIX + json.dumps(str(symbol))[1:-1].encode()
+                        + _ACK_SUCCESS_MID + (b"true" if success else b"false")
+                        + _ACK_TS_MID + now_iso().encode() + _TS_SUFFIX
+                    )
             
             elif message_type == "ping":
-                response = {
-                    "type": "pong",
-                    "timestamp": datetime.utcnow().isoformat()
-                }
-                await self.connection_manager.send_personal_message(connection_id, response)
-            
+                ts = now_iso().encode()
+                await self.connection_manager.send_raw(
+                    connection_id, _PONG_PREFIX + ts + _TS_SUFFIX
+                )
+
             else:
-                # Unknown message type
-                error_msg = {
-                    "type": "error",
-                    "message": f"Unknown message type: {message_type}",
-                    "timestamp": datetime.utcnow().isoformat()
-                }
-                await self.connection_manager.send_personal_message(connection_id, error_msg)
+                # Unknown message type; json.dumps escapes any quoting
+                # in the client-supplied value
+                escaped = json.dumps(str(message_type))[1:-1].encode()
+                ts = now_iso().encode()
+                await self.connection_manager.send_raw(
+                    connection_id,
+                    _UNKNOWN_TYPE_PREFIX + escaped
+                    + _UNKNOWN_TYPE_MID + ts + _TS_SUFFIX
+                )
             
         except Exception as e:
             logger.error(f"Failed to handle WebSocket message: {e}")
     
     async def broadcast_market_data(self, symbol: str, data: Dict[str, Any]):
-        """Broadcast market data to all subscribers"""
+        """Stage a market data update for the next flush
+
+        Updates are conflated per symbol: a tick superseded within one
+        flush window is dropped rather than sent, so fan-out cost
+        scales with active symbols per window instead of raw tick
+        rate. Each window's frames land in the per-connection writer
+        queues back to back, which coalesces them into one batch frame
+        per connection. Returns the current subscriber count for the
+        symbol.
+        """
         try:
-            message = {
-                "type": "market_data_update",
-                "symbol": symbol,
-                "data": data,
-                "timestamp": datetime.utcnow().isoformat()
-            }
-            
-            sent_count = await self.connection_manager.broadcast_to_symbol(symbol, message)
-            return sent_count
-            
+            self._pending[symbol] = data
+            if self._flush_task is None or self._flush_task.done():
+                self._flush_task = asyncio.create_task(self._flush_pending())
+            return self.connection_manager.get_subscription_count(symbol)
+
         except Exception as e:
             logger.error(f"Failed to broadcast market data for {symbol}: {e}")
             return 0
+
+    async def _flush_pending(self):
+        """Fan out the conflated updates every FLUSH_INTERVAL seconds"""
+        while True:
+            await asyncio.sleep(self.FLUSH_INTERVAL)
+            if not self._pending:
+                continue
+            pending = self._pending
+            self._pending = {}
+            for symbol, data in pending.items():
+                try:
+                    await self.connection_manager.broadcast_to_symbol(symbol, {
+                        "type": "market_data_update",
+                        "symbol": symbol,
+                        "data": data,
+                        "timestamp": now_iso()
+                    })
+                except Exception as e:
+                    logger.error(f"Failed to flush market data for {symbol}: {e}")
     
+    def enqueue_broadcast(self, symbol: str, data: Dict[str, Any]) -> bool:
+        """Queue a market data broadcast without awaiting the fan-out
+
+        The processing loop calls this synchronously, so one slow client
+        can never stall data ingestion: sends happen on a dedicated drain
+        task, and when the queue is full the oldest update is dropped in
+        favour of the fresher one.
+        """
+        try:
+            if self.broadcast_task is None or self.broadcast_task.done():
+                self.broadcast_task = asyncio.create_task(self._drain_broadcasts())
+
+            try:
+                self.broadcast_queue.put_nowait((symbol, data))
+            except asyncio.QueueFull:
+                # Drop the oldest queued update to make room for the new one
+                try:
+                    self.broadcast_queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    pass
+                self.broadcast_queue.put_nowait((symbol, data))
+                self.dropped_broadcasts += 1
+
+            return True
+
+        except Exception as e:
+            logger.error(f"Failed to enqueue broadcast for {symbol}: {e}")
+            return False
+
+    async def _drain_broadcasts(self):
+        """Drain the broadcast queue and fan out to subscribers"""
+        while True:
+            symbol, data = await self.broadcast_queue.get()
+            try:
+                await self.broadcast_market_data(symbol, data)
+            except Exception as e:
+                logger.error(f"Failed to drain broadcast for {symbol}: {e}")
+
     async def broadcast_system_message(self, message: str, message_type: str = "info"):
         """Broadcast system message to all connections"""
         try:
@@ -377,7 +647,7 @@ class WebSocketManager:
                 "type": "system_message",
                 "message_type": message_type,
                 "message": message,
-                "timestamp": datetime.utcnow().isoformat()
+                "timestamp": now_iso()
             }
             
             sent_count = await self.connection_manager.broadcast_to_all(system_message)
@@ -406,14 +676,11 @@ class WebSocketManager:
         
         while self.is_running:
             try:
-                # Check for stale connections (no activity for 5 minutes)
-                current_time = time.time()
-                stale_connections = []
-                
-                for connection_id, metadata in self.connection_manager.connection_metadata.items():
-                    if current_time - metadata.get("last_activity", 0) > 300:  # 5 minutes
-                        stale_connections.append(connection_id)
-                
+                # Check for stale connections (no activity for 5
+                # minutes); the heap pop only visits entries that are
+                # actually old instead of scanning every connection
+                stale_connections = self.connection_manager.pop_stale_connections(300)
+
                 # Disconnect stale connections
                 for connection_id in stale_connections:
                     logger.info(f"Disconnecting stale connection: {connection_id}")
@@ -438,3 +705,15 @@ class WebSocketManager:
                 await self.health_check_task
             except asyncio.CancelledError:
                 pass
+        if self.broadcast_task:
+            self.broadcast_task.cancel()
+            try:
+                await self.broadcast_task
+            except asyncio.CancelledError:
+                pass
+        if self._flush_task:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass